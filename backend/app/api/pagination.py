@@ -0,0 +1,48 @@
+"""
+Opaque keyset cursors for list endpoints.
+The body stays a plain list; the cursor for the next page is sent in the X-Next-Cursor header
+and is absent on the last page.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, List
+
+from fastapi import HTTPException, Response, status
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    raw = json.dumps(list(values), default=str, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: type) -> List[Any]:
+    """Values encoded in cursor, one per type; 400 if it is malformed or was not issued for this endpoint."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        values = None
+    # Exact type match so a JSON true/false is not taken for an int id
+    if (
+        not isinstance(values, list)
+        or len(values) != len(types)
+        or any(type(value) is not expected for value, expected in zip(values, types))
+    ):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return values
+
+
+def parse_cursor_time(value: Any) -> datetime:
+    """Timestamp stored in a decoded cursor; 400 if it is not an ISO datetime."""
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def set_next_cursor(response: Response, cursor: str | None) -> None:
+    if cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
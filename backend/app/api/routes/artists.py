@@ -1,14 +1,16 @@
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import and_, func, select, tuple_
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from app.api.pagination import decode_cursor, encode_cursor, parse_cursor_time, set_next_cursor
+from app.api.routes.jobs import job_to_read
 from app.core.security import get_current_user
 from app.db.session import get_db
 from app.models.artist import Artist
-from app.models.placement import Placement
-from app.models.playlist import Playlist
 from app.models.snapshot import Snapshot
 from app.models.user import User
 from app.schemas.artist import (
@@ -20,145 +22,52 @@ from app.schemas.artist import (
     ArtistRead,
     PlaylistSummary,
 )
+from app.schemas.job import JobRead
 from app.schemas.snapshot import SnapshotWithChanges
-from app.services.diffing import calculate_changes
-from app.services.discovery import discover_playlists, get_or_create_playlist
-from app.services.spotify_client import get_artist as get_spotify_artist
+from app.services.diffing import count_changes_sql, stream_change_counts
+from app.services.jobs import Job, JobQueueFull
+from app.services.placement_store import snapshot_placements, snapshot_placements_page
+from app.services.refresh import (
+    RefreshMode,
+    placements_to_summaries,
+    run_discovery_and_respond,
+    submit_refresh_job,
+)
+from app.services.spotify_client import artist_lookup_scope, get_artist as get_spotify_artist
 
 
 router = APIRouter(prefix="/artists", tags=["artists"])
 
 
-def _playlist_type_str(playlist):
-    return playlist.playlist_type.value if playlist.playlist_type else "user_generated"
-
-
-def _placements_to_summaries(placements, db):
-    out = []
-    for p in placements:
-        playlist = db.query(Playlist).filter(Playlist.id == p.playlist_id).first()
-        if playlist:
-            out.append(PlaylistSummary(
-                id=playlist.id,
-                name=playlist.name,
-                playlist_type=_playlist_type_str(playlist),
-                tracks_count=p.tracks_count,
-                total_tracks=getattr(p, "total_tracks", None),
-            ))
-    return out
+_ACCEPTED_RESPONSES = {
+    status.HTTP_202_ACCEPTED: {
+        "model": JobRead,
+        "description": "Discovery queued (`run_async=true`); poll `GET /api/jobs/{id}`.",
+    },
+}
 
 
-def _run_discovery_and_respond(artist, db, update_name_from_spotify=True):
-    spotify_id = artist.spotify_artist_id
-    if update_name_from_spotify:
-        try:
-            data = get_spotify_artist(spotify_id)
-            artist.name = data["name"]
-            if data.get("image_url"):
-                artist.image_url = data["image_url"]
-        except Exception:
-            pass
-
-    previous = (
-        db.query(Snapshot)
-        .filter(Snapshot.artist_id == artist.id)
-        .order_by(Snapshot.snapshot_time.desc())
-        .first()
-    )
-    discovered = discover_playlists(spotify_id, db)
-
-    snapshot = Snapshot(
-        artist_id=artist.id,
-        total_playlists_found=len(discovered),
-        playlists_checked_count=len(discovered),
-        discovery_method_used="hybrid",
-    )
-    db.add(snapshot)
-    db.flush()
-    
-    # Update artist timestamps - explicitly set to ensure they're updated
-    now = datetime.now(timezone.utc)
-    artist.last_snapshot_at = snapshot.snapshot_time
-    artist.updated_at = now  # Explicitly set updated_at
-
-    for pl in discovered:
-        playlist = get_or_create_playlist(
-            spotify_playlist_id=pl["spotify_playlist_id"],
-            name=pl["name"],
-            owner_id=pl.get("owner_id"),
-            owner_name=pl.get("owner_name"),
-            follower_count=pl.get("follower_count"),
-            db=db,
-        )
-        placement = Placement(
-            artist_id=artist.id,
-            playlist_id=playlist.id,
-            snapshot_id=snapshot.id,
-            tracks_count=pl.get("tracks_count", 1),
-            total_tracks=pl.get("total_tracks"),
+def _enqueue_refresh(
+    artist: Artist, current_user: User, mode: RefreshMode = RefreshMode.FULL
+) -> JSONResponse:
+    try:
+        job: Job = submit_refresh_job(artist.id, current_user.id, mode)
+    except JobQueueFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
         )
-        db.add(placement)
-
-    db.commit()
-    db.refresh(artist)
-    db.refresh(snapshot)
-
-    gained_ids, lost_ids = calculate_changes(
-        previous.id if previous else None,
-        snapshot.id,
-        db,
-    )
-
-    gained = []
-    for pid in gained_ids:
-        pl = db.query(Playlist).filter(Playlist.id == pid).first()
-        pc = db.query(Placement).filter(
-            Placement.playlist_id == pid,
-            Placement.snapshot_id == snapshot.id,
-        ).first()
-        if pl and pc:
-            gained.append(PlaylistSummary(
-                id=pl.id,
-                name=pl.name,
-                playlist_type=_playlist_type_str(pl),
-                tracks_count=pc.tracks_count,
-                total_tracks=getattr(pc, "total_tracks", None),
-            ))
-
-    lost = []
-    for pid in lost_ids:
-        pl = db.query(Playlist).filter(Playlist.id == pid).first()
-        if pl:
-            lost.append(PlaylistSummary(
-                id=pl.id,
-                name=pl.name,
-                playlist_type=_playlist_type_str(pl),
-                tracks_count=0,
-            ))
-
-    current_placements = (
-        db.query(Placement)
-        .filter(Placement.artist_id == artist.id)
-        .filter(Placement.snapshot_id == snapshot.id)
-        .all()
-    )
-    current_playlists = _placements_to_summaries(current_placements, db)
-
-    return ArtistQueryResponse(
-        artist=artist,
-        snapshot={
-            "id": snapshot.id,
-            "snapshot_time": snapshot.snapshot_time,
-            "total_playlists_found": snapshot.total_playlists_found,
-        },
-        changes={"gained": gained, "lost": lost},
-        current_playlists=current_playlists,
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=job_to_read(job).model_dump(mode="json"),
+        headers={"Location": f"/api/jobs/{job.id}"},
     )
 
 
 @router.post(
     "/from-url",
     response_model=ArtistQueryResponse,
+    responses=_ACCEPTED_RESPONSES,
     summary="Create Artist from URL",
     description="Provide only the artist profile URL (SoundCloud or Spotify). The backend resolves the artist ID and name, creates the artist, and runs playlist discovery. Use this when working with SoundCloud or when you only have a URL.",
 )
@@ -168,7 +77,7 @@ def create_artist_from_url(
     current_user: User = Depends(get_current_user),
 ):
     return query_artist(
-        ArtistQueryRequest(spotify_url=body.url.strip(), force_refresh=False),
+        ArtistQueryRequest(spotify_url=body.url.strip(), force_refresh=False, run_async=body.run_async),
         db,
         current_user,
     )
@@ -197,45 +106,94 @@ def create_artist(
     return artist
 
 
-@router.get("/", response_model=list[ArtistListEntry])
+@router.get(
+    "/",
+    response_model=list[ArtistListEntry],
+    description="Artists ordered by id. Pass `limit` to page through them; the next page's `cursor` is returned in the `X-Next-Cursor` header (absent on the last page).",
+)
 def list_artists(
+    response: Response,
+    limit: int | None = Query(None, ge=1, le=500),
+    cursor: str | None = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    artists = db.query(Artist).filter(Artist.user_id == current_user.id).all()
-    result = []
-    for artist in artists:
-        last_snap = (
-            db.query(Snapshot)
-            .filter(Snapshot.artist_id == artist.id)
-            .order_by(Snapshot.snapshot_time.desc())
-            .first()
-        )
-        prev_snap = None
-        if last_snap:
-            prev_snap = (
-                db.query(Snapshot)
-                .filter(Snapshot.artist_id == artist.id)
-                .order_by(Snapshot.snapshot_time.desc())
-                .offset(1)
-                .first()
+    # Keyset page of artist ids; the snapshot ranking below only covers the artists on this page
+    page = select(Artist.id).where(Artist.user_id == current_user.id)
+    if cursor is not None:
+        (after_id,) = decode_cursor(cursor, int)
+        page = page.where(Artist.id > after_id)
+    page = page.order_by(Artist.id)
+    if limit is not None:
+        page = page.limit(limit + 1)
+    page_ids = page.scalar_subquery() if limit is not None or cursor is not None else None
+
+    # Latest snapshot per artist via a window function: one statement for the whole dashboard.
+    # Gained/lost come from the stored change summary; snapshots without one are diffed in SQL.
+    ranked = (
+        select(
+            Snapshot.id.label("id"),
+            Snapshot.artist_id.label("artist_id"),
+            Snapshot.total_playlists_found.label("total_playlists_found"),
+            Snapshot.gained_count.label("gained_count"),
+            Snapshot.lost_count.label("lost_count"),
+            func.row_number()
+            .over(
+                partition_by=Snapshot.artist_id,
+                order_by=(Snapshot.snapshot_time.desc(), Snapshot.id.desc()),
             )
-        gained_ids, lost_ids = (
-            calculate_changes(prev_snap.id if prev_snap else None, last_snap.id, db)
-            if last_snap
-            else ([], [])
+            .label("rn"),
+        )
+        .join(Artist, Artist.id == Snapshot.artist_id)
+        .where(Artist.user_id == current_user.id)
+    )
+    if page_ids is not None:
+        ranked = ranked.where(Snapshot.artist_id.in_(page_ids))
+    ranked = ranked.cte("ranked_snapshots")
+    latest = ranked.alias("latest")
+    previous = ranked.alias("previous")
+    diff_gained, diff_lost = count_changes_sql(latest.c.id, previous.c.id)
+    gained_count = func.coalesce(latest.c.gained_count, diff_gained)
+    lost_count = func.coalesce(latest.c.lost_count, diff_lost)
+    statement = (
+        select(
+            Artist.id,
+            Artist.spotify_artist_id,
+            Artist.name,
+            Artist.spotify_url,
+            Artist.image_url,
+            Artist.last_snapshot_at,
+            latest.c.id.label("last_snapshot_id"),
+            latest.c.total_playlists_found.label("last_playlist_count"),
+            gained_count.label("last_gained_count"),
+            lost_count.label("last_lost_count"),
         )
+        .outerjoin(latest, and_(latest.c.artist_id == Artist.id, latest.c.rn == 1))
+        .outerjoin(previous, and_(previous.c.artist_id == Artist.id, previous.c.rn == 2))
+        .where(Artist.user_id == current_user.id)
+        .order_by(Artist.id)
+    )
+    if page_ids is not None:
+        statement = statement.where(Artist.id.in_(page_ids))
+    rows = db.execute(statement).all()
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        set_next_cursor(response, encode_cursor(rows[-1].id))
+
+    result = []
+    for row in rows:
+        has_snapshot = row.last_snapshot_id is not None
         result.append(
             ArtistListEntry(
-                id=artist.id,
-                spotify_artist_id=artist.spotify_artist_id,
-                name=artist.name,
-                spotify_url=artist.spotify_url,
-                image_url=artist.image_url,
-                last_snapshot_at=artist.last_snapshot_at,
-                last_playlist_count=last_snap.total_playlists_found if last_snap else None,
-                last_gained_count=len(gained_ids) if last_snap else None,
-                last_lost_count=len(lost_ids) if last_snap else None,
+                id=row.id,
+                spotify_artist_id=row.spotify_artist_id,
+                name=row.name,
+                spotify_url=row.spotify_url,
+                image_url=row.image_url,
+                last_snapshot_at=row.last_snapshot_at,
+                last_playlist_count=row.last_playlist_count,
+                last_gained_count=row.last_gained_count if has_snapshot else None,
+                last_lost_count=row.last_lost_count if has_snapshot else None,
             )
         )
     return result
@@ -260,9 +218,19 @@ def get_artist(
     return artist
 
 
-@router.get("/{artist_id}/history", response_model=list[SnapshotWithChanges])
+@router.get(
+    "/{artist_id}/history",
+    response_model=list[SnapshotWithChanges],
+    summary="Get Artist History",
+    description="Snapshots newest first with gained/lost counts. Use `since`/`until` to bound the time window and `limit` to page through it; the next page's `cursor` is returned in the `X-Next-Cursor` header (absent on the last page).",
+)
 def get_artist_history(
     artist_id: int,
+    response: Response,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    limit: int | None = Query(None, ge=1, le=5000),
+    cursor: str | None = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -276,39 +244,56 @@ def get_artist_history(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Artist not found",
         )
-    snapshots = (
-        db.query(Snapshot)
-        .filter(Snapshot.artist_id == artist_id)
-        .order_by(Snapshot.snapshot_time.desc())
-        .all()
-    )
-    result = []
-    for i, s in enumerate(snapshots):
-        prev_id = snapshots[i + 1].id if i + 1 < len(snapshots) else None
-        gained_ids, lost_ids = calculate_changes(prev_id, s.id, db)
-        result.append(
-            SnapshotWithChanges(
-                id=s.id,
-                artist_id=s.artist_id,
-                snapshot_time=s.snapshot_time,
-                total_playlists_found=s.total_playlists_found,
-                playlists_checked_count=s.playlists_checked_count,
-                discovery_method_used=s.discovery_method_used,
-                gained_count=len(gained_ids),
-                lost_count=len(lost_ids),
-            )
+    query = db.query(Snapshot).filter(Snapshot.artist_id == artist_id)
+    if since is not None:
+        query = query.filter(Snapshot.snapshot_time >= since)
+    if until is not None:
+        query = query.filter(Snapshot.snapshot_time <= until)
+    if cursor is not None:
+        # Keyset on (snapshot_time, id). The anchor time is read back from the row itself so it
+        # compares in the stored format; the encoded time covers a since-deleted anchor.
+        anchor_time, anchor_id = decode_cursor(cursor, str, int)
+        anchor = func.coalesce(
+            select(Snapshot.snapshot_time).where(Snapshot.id == anchor_id).scalar_subquery(),
+            parse_cursor_time(anchor_time),
         )
-    return result
+        query = query.filter(tuple_(Snapshot.snapshot_time, Snapshot.id) < tuple_(anchor, anchor_id))
+    query = query.order_by(Snapshot.snapshot_time.desc(), Snapshot.id.desc())
+    if limit is not None:
+        query = query.limit(limit + 1)
+    snapshots = query.all()
+    if limit is not None and len(snapshots) > limit:
+        snapshots = snapshots[:limit]
+        last = snapshots[-1]
+        set_next_cursor(response, encode_cursor(last.snapshot_time.isoformat(), last.id))
+
+    counts = stream_change_counts(list(reversed(snapshots)), db) if snapshots else {}
+    return [
+        SnapshotWithChanges(
+            id=s.id,
+            artist_id=s.artist_id,
+            snapshot_time=s.snapshot_time,
+            total_playlists_found=s.total_playlists_found,
+            playlists_checked_count=s.playlists_checked_count,
+            discovery_method_used=s.discovery_method_used,
+            gained_count=counts[s.id][0],
+            lost_count=counts[s.id][1],
+        )
+        for s in snapshots
+    ]
 
 
 @router.get(
     "/{artist_id}/playlists",
     response_model=list[PlaylistSummary],
     summary="Get Artist Playlists",
-    description="Returns playlists from the latest snapshot for this artist. The `artist_id` is the **internal database ID** (from `GET /api/artists/` or the `artist.id` in `POST /api/artists/query`), not the SoundCloud/Spotify artist ID.",
+    description="Returns playlists from the latest snapshot for this artist. The `artist_id` is the **internal database ID** (from `GET /api/artists/` or the `artist.id` in `POST /api/artists/query`), not the SoundCloud/Spotify artist ID. Pass `limit` to page through them by playlist id; the next page's `cursor` is returned in the `X-Next-Cursor` header.",
 )
 def get_artist_playlists(
     artist_id: int,
+    response: Response,
+    limit: int | None = Query(None, ge=1, le=500),
+    cursor: str | None = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -325,23 +310,30 @@ def get_artist_playlists(
     latest = (
         db.query(Snapshot)
         .filter(Snapshot.artist_id == artist_id)
-        .order_by(Snapshot.snapshot_time.desc())
+        .order_by(Snapshot.snapshot_time.desc(), Snapshot.id.desc())
         .first()
     )
     if not latest:
         return []
-    placements = (
-        db.query(Placement)
-        .filter(Placement.artist_id == artist_id)
-        .filter(Placement.snapshot_id == latest.id)
-        .all()
-    )
-    return _placements_to_summaries(placements, db)
+    if limit is None and cursor is None:
+        return placements_to_summaries(snapshot_placements(latest.id, db), db)
+    after_playlist_id = decode_cursor(cursor, int)[0] if cursor is not None else None
+    placements = snapshot_placements_page(latest, after_playlist_id, limit, db)
+    if limit is not None and len(placements) > limit:
+        placements = placements[:limit]
+        set_next_cursor(response, encode_cursor(placements[-1].playlist_id))
+    return placements_to_summaries(placements, db)
 
 
-@router.post("/{artist_id}/refresh", response_model=ArtistQueryResponse)
+@router.post(
+    "/{artist_id}/refresh",
+    response_model=ArtistQueryResponse,
+    responses=_ACCEPTED_RESPONSES,
+)
 def refresh_artist(
     artist_id: int,
+    run_async: bool = False,
+    mode: RefreshMode = RefreshMode.FULL,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -355,15 +347,24 @@ def refresh_artist(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Artist not found",
         )
-    return _run_discovery_and_respond(artist, db, update_name_from_spotify=True)
+    if run_async:
+        return _enqueue_refresh(artist, current_user, mode)
+    with artist_lookup_scope():
+        return run_discovery_and_respond(artist, db, update_name_from_spotify=True, mode=mode)
 
 
-@router.post("/query", response_model=ArtistQueryResponse)
+@router.post("/query", response_model=ArtistQueryResponse, responses=_ACCEPTED_RESPONSES)
 def query_artist(
     payload: ArtistQueryRequest,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
+    # One artist metadata fetch serves the lookup below, the name refresh and discovery
+    with artist_lookup_scope():
+        return _query_artist(payload, db, current_user)
+
+
+def _query_artist(payload: ArtistQueryRequest, db: Session, current_user: User):
     from app.core.provider import get_effective_provider
     from app.services.soundcloud_client import resolve_soundcloud_url
 
@@ -474,8 +475,12 @@ def query_artist(
             artist.image_url = artist_image_url
         artist.updated_at = datetime.now(timezone.utc)  # Explicitly set updated_at on update
 
+    if payload.run_async:
+        db.commit()  # The job reads the artist from its own session
+        return _enqueue_refresh(artist, current_user)
+
     try:
-        return _run_discovery_and_respond(artist, db, update_name_from_spotify=True)
+        return run_discovery_and_respond(artist, db, update_name_from_spotify=True)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.core.security import get_current_user
+from app.models.user import User
+from app.schemas.job import JobRead
+from app.services.jobs import Job, get_job
+
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+def job_to_read(job: Job) -> JobRead:
+    return JobRead(
+        id=job.id,
+        kind=job.kind,
+        state=job.state.value,
+        progress=job.progress,
+        artist_id=job.artist_id,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        error=job.error,
+        result=job.result,
+    )
+
+
+@router.get(
+    "/{job_id}",
+    response_model=JobRead,
+    summary="Get Job Status",
+    description="Poll a background refresh started with `run_async=true`. Returns state, progress and, when finished, the `ArtistQueryResponse`.",
+)
+def get_job_status(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+):
+    job = get_job(job_id)
+    if not job or job.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found",
+        )
+    return job_to_read(job)
@@ -16,6 +16,23 @@ class Settings(BaseSettings):
     PORT: int = 8000
     DATABASE_URL: str = "sqlite:///./artist_tracker.db"
 
+    # Database connection pool (file-backed SQLite and server databases)
+    DATABASE_POOL_SIZE: int = 10
+    DATABASE_MAX_OVERFLOW: int = 10
+
+    # SQLite profile applied to every connection (ignored for other databases)
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_CACHE_SIZE_KB: int = 65536
+    SQLITE_MMAP_SIZE_BYTES: int = 268435456
+    SQLITE_TEMP_STORE: str = "MEMORY"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+
+    # Placement storage per snapshot: "full" copies every placement, "delta" stores only changes
+    # since the previous snapshot with a full keyframe every PLACEMENT_KEYFRAME_INTERVAL snapshots
+    PLACEMENT_STORAGE_MODE: str = "full"
+    PLACEMENT_KEYFRAME_INTERVAL: int = 20
+
     SPOTIFY_CLIENT_ID: str = ""
     SPOTIFY_CLIENT_SECRET: str = ""
     
@@ -26,6 +43,71 @@ class Settings(BaseSettings):
     # Music API Provider: "spotify", "soundcloud", or "mock"
     MUSIC_API_PROVIDER: str = "soundcloud"
 
+    # Discovery: max concurrent playlist verifications per refresh
+    DISCOVERY_MAX_WORKERS: int = 8
+    # Tracks read per playlist when counting an artist's tracks (streamed page by page; 0 = no cap)
+    DISCOVERY_MAX_TRACKS_PER_PLAYLIST: int = 10000
+    # Skip re-verifying candidates whose version marker (Spotify snapshot_id) matches the previous snapshot
+    DISCOVERY_REUSE_UNCHANGED: bool = True
+
+    # Provider rate limiting (per process, shared by all threads)
+    SPOTIFY_RATE_LIMIT_PER_SECOND: float = 10.0
+    SPOTIFY_RATE_LIMIT_BURST: int = 20
+    SOUNDCLOUD_RATE_LIMIT_PER_SECOND: float = 5.0
+    SOUNDCLOUD_RATE_LIMIT_BURST: int = 10
+    PROVIDER_MAX_RETRIES: int = 3
+    PROVIDER_BACKOFF_BASE_SECONDS: float = 0.5
+    PROVIDER_BACKOFF_MAX_SECONDS: float = 30.0
+
+    # Provider HTTP sessions (keep-alive connection pool per provider)
+    PROVIDER_HTTP_POOL_SIZE: int = 16
+    PROVIDER_HTTP_CONNECT_TIMEOUT: float = 5.0
+    PROVIDER_HTTP_READ_TIMEOUT: float = 10.0
+    PROVIDER_HTTP_CONNECT_RETRIES: int = 2
+
+    # Persistent ETag cache for provider GETs (SQLite file; empty path disables it)
+    PROVIDER_HTTP_CACHE_PATH: str = "./provider_http_cache.db"
+    PROVIDER_HTTP_CACHE_MAX_ENTRIES: int = 50000
+    PROVIDER_HTTP_CACHE_MAX_AGE_DAYS: int = 30
+
+    # Provider OAuth tokens are renewed in the background this long before expiry
+    PROVIDER_TOKEN_REFRESH_MARGIN_SECONDS: int = 300
+
+    # Process-wide cache of provider playlist payloads (shared across artists)
+    PLAYLIST_CACHE_MAX_ENTRIES: int = 2000
+    PLAYLIST_CACHE_TTL_SECONDS: int = 900
+
+    # Artist metadata and SoundCloud URL resolution caches
+    ARTIST_CACHE_MAX_ENTRIES: int = 1000
+    ARTIST_CACHE_TTL_SECONDS: int = 300
+    URL_RESOLVE_CACHE_TTL_SECONDS: int = 86400
+
+    # Background refresh jobs (run_async=true)
+    JOB_MAX_WORKERS: int = 2
+    JOB_MAX_PENDING: int = 100
+    JOB_RESULT_TTL_SECONDS: int = 3600
+
+    # Background refresh scheduler (cadence per Artist.refresh_tier)
+    SCHEDULER_ENABLED: bool = False
+    SCHEDULER_POLL_SECONDS: int = 60
+    SCHEDULER_JITTER_FRACTION: float = 0.1
+    SCHEDULER_MAX_CONCURRENT: int = 2
+    SCHEDULER_MAX_CONCURRENT_PER_PROVIDER: int = 1
+    REFRESH_INTERVAL_TIER1_HOURS: float = 6
+    REFRESH_INTERVAL_TIER2_HOURS: float = 12
+    REFRESH_INTERVAL_DEFAULT_HOURS: float = 24
+    # Scheduled refreshes run full search-based discovery at most this often per artist and
+    # otherwise only re-verify the latest snapshot's playlists (0 = always full discovery)
+    REFRESH_FULL_DISCOVERY_INTERVAL_HOURS: float = 72
+
+    # Snapshot retention: keep everything for KEEP_ALL_DAYS, then one per day until
+    # KEEP_DAILY_DAYS, then one per ISO week. Deletes run BATCH_SIZE snapshots per transaction.
+    RETENTION_ENABLED: bool = False
+    RETENTION_KEEP_ALL_DAYS: int = 7
+    RETENTION_KEEP_DAILY_DAYS: int = 90
+    RETENTION_BATCH_SIZE: int = 200
+    RETENTION_INTERVAL_SECONDS: int = 21600
+
     # Auth / JWT
     AUTH_SECRET_KEY: str = "change-me-to-a-long-random-string"
     AUTH_ALGORITHM: str = "HS256"
@@ -0,0 +1,152 @@
+"""
+Concurrent read/write benchmark for the SQLite profile.
+
+Runs refresh-like writers (one snapshot plus its placements per transaction) alongside
+dashboard-like readers against a temporary database, once with the previous engine setup
+(default rollback journal, no pragmas) and once with the configured profile.
+
+    python -m app.db.benchmark --writers 2 --readers 6 --seconds 10
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, func, insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session import Base, create_db_engine, sqlite_pragmas
+from app.models import Artist, Placement, Playlist, Snapshot, User
+
+ARTISTS = 20
+PLAYLISTS = 500
+PLACEMENTS_PER_SNAPSHOT = 50
+
+
+def _seed(Session) -> None:
+    db = Session()
+    try:
+        db.add(User(email="bench@example.com", password_hash="x"))
+        db.flush()
+        db.execute(insert(Artist), [
+            {
+                "spotify_artist_id": f"artist{i}",
+                "name": f"Artist {i}",
+                "spotify_url": f"https://open.spotify.com/artist/artist{i}",
+                "user_id": 1,
+            }
+            for i in range(ARTISTS)
+        ])
+        db.execute(insert(Playlist), [
+            {"spotify_playlist_id": f"pl{i}", "name": f"Playlist {i}"}
+            for i in range(PLAYLISTS)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+
+def _write_snapshot(Session, artist_id: int, n: int) -> None:
+    db = Session()
+    try:
+        snapshot = Snapshot(artist_id=artist_id, total_playlists_found=PLACEMENTS_PER_SNAPSHOT)
+        db.add(snapshot)
+        db.flush()
+        offset = (n * 7) % (PLAYLISTS - PLACEMENTS_PER_SNAPSHOT)
+        db.execute(insert(Placement), [
+            {"artist_id": artist_id, "playlist_id": offset + i + 1, "snapshot_id": snapshot.id}
+            for i in range(PLACEMENTS_PER_SNAPSHOT)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+
+def _read_dashboard(Session) -> None:
+    db = Session()
+    try:
+        latest = (
+            db.query(Snapshot.artist_id, func.max(Snapshot.id).label("snapshot_id"))
+            .group_by(Snapshot.artist_id)
+            .subquery()
+        )
+        (
+            db.query(latest.c.artist_id, func.count(Placement.id))
+            .join(Placement, Placement.snapshot_id == latest.c.snapshot_id)
+            .group_by(latest.c.artist_id)
+            .all()
+        )
+    finally:
+        db.close()
+
+
+def run(engine, writers: int, readers: int, seconds: float) -> dict:
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    _seed(Session)
+
+    counts = {"writes": 0, "reads": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def worker(kind: str, index: int) -> None:
+        n = 0
+        while time.monotonic() < deadline:
+            try:
+                if kind == "writes":
+                    _write_snapshot(Session, index % ARTISTS + 1, n)
+                else:
+                    _read_dashboard(Session)
+                key = kind
+            except OperationalError:
+                key = "errors"  # "database is locked"
+            n += 1
+            with lock:
+                counts[key] += 1
+
+    threads = [threading.Thread(target=worker, args=("writes", i)) for i in range(writers)]
+    threads += [threading.Thread(target=worker, args=("reads", i)) for i in range(readers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    engine.dispose()
+    return {
+        "writes_per_second": round(counts["writes"] / seconds, 1),
+        "reads_per_second": round(counts["reads"] / seconds, 1),
+        "locked_errors": counts["errors"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--readers", type=int, default=6)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline_url = f"sqlite:///{os.path.join(tmp, 'baseline.db')}"
+        tuned_url = f"sqlite:///{os.path.join(tmp, 'tuned.db')}"
+        results = {
+            "baseline": run(
+                create_engine(baseline_url, connect_args={"check_same_thread": False}),
+                args.writers, args.readers, args.seconds,
+            ),
+            "profile": run(create_db_engine(tuned_url), args.writers, args.readers, args.seconds),
+        }
+
+    print(f"SQLite profile: {sqlite_pragmas()}")
+    print(f"{args.writers} writers, {args.readers} readers, {args.seconds:g}s each")
+    for name, result in results.items():
+        print(
+            f"  {name:<9} writes/s={result['writes_per_second']:<8} "
+            f"reads/s={result['reads_per_second']:<8} locked={result['locked_errors']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
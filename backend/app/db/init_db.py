@@ -1,7 +1,8 @@
 from sqlalchemy import text
 
-from app.db.session import Base, engine
+from app.db.session import Base, SessionLocal, engine
 from app.models import Artist, Placement, Playlist, Snapshot, User
+from app.services.diffing import backfill_snapshot_changes
 
 
 def init_db():
@@ -12,12 +13,63 @@ def init_db():
             conn.execute(text("ALTER TABLE placements ADD COLUMN total_tracks INTEGER"))
     except Exception:
         pass  # Column already exists or DB doesn't support ALTER
+    # Add delta-storage removal marker to placements if missing (existing DBs)
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE placements ADD COLUMN removed BOOLEAN NOT NULL DEFAULT 0"))
+    except Exception:
+        pass  # Column already exists
+    # Add the playlist version marker to placements if missing (existing DBs)
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE placements ADD COLUMN source_marker VARCHAR"))
+    except Exception:
+        pass  # Column already exists
     # Add user_id to artists if missing (existing DBs)
     try:
         with engine.begin() as conn:
             conn.execute(text("ALTER TABLE artists ADD COLUMN user_id INTEGER"))
     except Exception:
         pass  # Column already exists
+    # Add persisted change summary to snapshots if missing (existing DBs)
+    for column in (
+        "previous_snapshot_id INTEGER REFERENCES snapshots(id)",
+        "gained_count INTEGER",
+        "lost_count INTEGER",
+        "gained_playlist_ids JSON",
+        "lost_playlist_ids JSON",
+        "delta_depth INTEGER",
+    ):
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE snapshots ADD COLUMN {column}"))
+        except Exception:
+            pass  # Column already exists
+
+    # Composite indexes for the snapshot/placement access patterns (existing DBs); they
+    # replace the single-column indexes that are a prefix of them
+    for index in (
+        "ix_snapshots_artist_time ON snapshots (artist_id, snapshot_time, id)",
+        "ix_placements_snapshot_playlist ON placements (snapshot_id, playlist_id)",
+        "ix_placements_artist_snapshot ON placements (artist_id, snapshot_id)",
+        "ix_placements_playlist_snapshot ON placements (playlist_id, snapshot_id)",
+    ):
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS {index}"))
+        except Exception as e:
+            print(f"Could not create index {index.split()[0]}: {e}")
+    for index in (
+        "ix_snapshots_artist_id",
+        "ix_placements_snapshot_id",
+        "ix_placements_artist_id",
+        "ix_placements_playlist_id",
+    ):
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(f"DROP INDEX IF EXISTS {index}"))
+        except Exception:
+            pass
 
     # Migration: allow same artist for different users (unique per user, not global)
     need_migrate = True
@@ -61,6 +113,15 @@ def init_db():
         except Exception:
             pass  # Already migrated or error
 
+    # Backfill change summaries for snapshots written before they were stored (no-op once done)
+    db = SessionLocal()
+    try:
+        updated = backfill_snapshot_changes(db)
+        if updated:
+            print(f"Backfilled change summary for {updated} snapshots")
+    finally:
+        db.close()
+
 
 if __name__ == "__main__":
     init_db()
@@ -1,13 +1,83 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from app.core.config import settings
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    echo=False
-)
+_SQLITE_PRAGMA_CHOICES = {
+    "journal_mode": {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"},
+    "synchronous": {"OFF", "NORMAL", "FULL", "EXTRA"},
+    "temp_store": {"DEFAULT", "FILE", "MEMORY"},
+}
+
+
+def _is_sqlite_memory(url: str) -> bool:
+    return url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+
+
+def sqlite_pragmas() -> dict:
+    """PRAGMA name -> value for the configured SQLite profile."""
+    pragmas = {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE.upper(),
+        "synchronous": settings.SQLITE_SYNCHRONOUS.upper(),
+        "cache_size": -abs(int(settings.SQLITE_CACHE_SIZE_KB)),  # Negative means KiB, not pages
+        "mmap_size": int(settings.SQLITE_MMAP_SIZE_BYTES),
+        "temp_store": settings.SQLITE_TEMP_STORE.upper(),
+        "busy_timeout": int(settings.SQLITE_BUSY_TIMEOUT_MS),
+    }
+    for name, choices in _SQLITE_PRAGMA_CHOICES.items():
+        if pragmas[name] not in choices:
+            raise ValueError(f"Invalid SQLite {name} {pragmas[name]!r}; expected one of {sorted(choices)}")
+    return pragmas
+
+
+def create_db_engine(url: str, apply_sqlite_profile: bool = True) -> Engine:
+    """
+    Create the engine for url. SQLite connections get the configured PRAGMA profile
+    (WAL, busy timeout, ...); in-memory SQLite shares one connection so all sessions see the same data.
+    """
+    if not url.startswith("sqlite"):
+        return create_engine(
+            url,
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+            pool_pre_ping=True,
+            echo=False,
+        )
+
+    connect_args = {"check_same_thread": False}
+    if _is_sqlite_memory(url):
+        db_engine = create_engine(url, connect_args=connect_args, poolclass=StaticPool, echo=False)
+    else:
+        # sqlite3 waits this long for a lock before raising "database is locked"
+        connect_args["timeout"] = settings.SQLITE_BUSY_TIMEOUT_MS / 1000
+        db_engine = create_engine(
+            url,
+            connect_args=connect_args,
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+            echo=False,
+        )
+
+    if apply_sqlite_profile:
+        pragmas = sqlite_pragmas()
+        if _is_sqlite_memory(url):
+            pragmas.pop("journal_mode")  # In-memory databases have no journal file to put in WAL
+
+        @event.listens_for(db_engine, "connect")
+        def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                for name, value in pragmas.items():
+                    cursor.execute(f"PRAGMA {name}={value}")
+            finally:
+                cursor.close()
+
+    return db_engine
+
+
+engine = create_db_engine(settings.DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
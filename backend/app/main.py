@@ -6,7 +6,8 @@ from fastapi.responses import JSONResponse
 
 from app.core.config import settings
 from app.db.init_db import init_db
-from app.api.routes import artists, playlists, config, auth
+from app.api.routes import artists, playlists, config, auth, jobs
+from app.services import jobs as job_queue, retention, scheduler
 from app.core.security import ApiKeyDependency
 
 logger = logging.getLogger(__name__)
@@ -51,6 +52,17 @@ async def global_exception_handler(request, exc):
 @app.on_event("startup")
 async def startup_event():
     init_db()
+    if settings.SCHEDULER_ENABLED:
+        scheduler.start()
+    if settings.RETENTION_ENABLED:
+        retention.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    scheduler.stop()
+    retention.stop()
+    job_queue.shutdown()
 
 
 app.include_router(
@@ -64,6 +76,11 @@ app.include_router(
     prefix="/api",
 )
 
+app.include_router(
+    jobs.router,
+    prefix="/api",
+)
+
 app.include_router(
     playlists.router,
     prefix="/api",
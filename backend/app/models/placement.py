@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy import Boolean, Column, Integer, ForeignKey, DateTime, Index, String
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.session import Base
@@ -6,13 +6,21 @@ from app.db.session import Base
 
 class Placement(Base):
     __tablename__ = "placements"
+    __table_args__ = (
+        # Playlist ids of a snapshot (diffs, current playlists) without touching the table
+        Index("ix_placements_snapshot_playlist", "snapshot_id", "playlist_id"),
+        Index("ix_placements_artist_snapshot", "artist_id", "snapshot_id"),
+        Index("ix_placements_playlist_snapshot", "playlist_id", "snapshot_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    artist_id = Column(Integer, ForeignKey("artists.id"), nullable=False, index=True)
-    playlist_id = Column(Integer, ForeignKey("playlists.id"), nullable=False, index=True)
-    snapshot_id = Column(Integer, ForeignKey("snapshots.id"), nullable=False, index=True)
+    artist_id = Column(Integer, ForeignKey("artists.id"), nullable=False)
+    playlist_id = Column(Integer, ForeignKey("playlists.id"), nullable=False)
+    snapshot_id = Column(Integer, ForeignKey("snapshots.id"), nullable=False)
     tracks_count = Column(Integer, default=1)  # tracks by this artist
     total_tracks = Column(Integer, nullable=True)  # total tracks in playlist (from API)
+    source_marker = Column(String, nullable=True)  # playlist version the counts were taken at (Spotify snapshot_id)
+    removed = Column(Boolean, nullable=False, default=False, server_default="0")  # delta snapshots: playlist dropped
     first_seen_at = Column(DateTime(timezone=True), server_default=func.now())
     last_seen_at = Column(DateTime(timezone=True), onupdate=func.now())
     created_at = Column(DateTime(timezone=True), server_default=func.now())
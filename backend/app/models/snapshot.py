@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, String
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, String, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.session import Base
@@ -6,13 +6,25 @@ from app.db.session import Base
 
 class Snapshot(Base):
     __tablename__ = "snapshots"
+    __table_args__ = (
+        # Per-artist history newest/oldest first: filter on artist_id, order by (snapshot_time, id)
+        Index("ix_snapshots_artist_time", "artist_id", "snapshot_time", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    artist_id = Column(Integer, ForeignKey("artists.id"), nullable=False, index=True)
+    artist_id = Column(Integer, ForeignKey("artists.id"), nullable=False)
     snapshot_time = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     total_playlists_found = Column(Integer, default=0)
     playlists_checked_count = Column(Integer, default=0)
     discovery_method_used = Column(String, nullable=True)
+    # Change summary vs. the previous snapshot, recorded at write time (NULL until computed)
+    previous_snapshot_id = Column(Integer, ForeignKey("snapshots.id"), nullable=True)
+    gained_count = Column(Integer, nullable=True)
+    lost_count = Column(Integer, nullable=True)
+    gained_playlist_ids = Column(JSON, nullable=True)
+    lost_playlist_ids = Column(JSON, nullable=True)
+    # Placement storage: 0/NULL = keyframe (all placements), n = delta n steps after the keyframe
+    delta_depth = Column(Integer, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     artist = relationship("Artist", back_populates="snapshots")
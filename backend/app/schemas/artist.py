@@ -6,6 +6,7 @@ class ArtistCreateFromUrl(BaseModel):
     """Create an artist by providing only their profile URL. The backend resolves the provider (SoundCloud or Spotify) and fetches ID and name, then runs playlist discovery."""
 
     url: str = Field(..., description="Artist profile URL (e.g. https://soundcloud.com/artist-name or https://open.spotify.com/artist/...)")
+    run_async: bool = Field(False, description="Queue discovery as a background job and return 202 with the job instead of waiting")
 
 
 
@@ -42,6 +43,7 @@ class ArtistListEntry(ArtistBase):
 class ArtistQueryRequest(BaseModel):
     spotify_url: str
     force_refresh: bool = False
+    run_async: bool = Field(False, description="Queue discovery as a background job and return 202 with the job instead of waiting")
 
 
 class PlaylistSummary(BaseModel):
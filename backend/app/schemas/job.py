@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+from app.schemas.artist import ArtistQueryResponse
+
+
+class JobRead(BaseModel):
+    """Background refresh job. `result` is set once `state` is `succeeded`."""
+    id: str
+    kind: str
+    state: str
+    progress: float
+    artist_id: int | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    error: str | None = None
+    result: ArtistQueryResponse | None = None
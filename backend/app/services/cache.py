@@ -0,0 +1,102 @@
+"""
+In-process TTL + LRU cache for provider responses.
+Cached values are shared between threads and must be treated as read-only by callers.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class TTLCache:
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self.maxsize = max(maxsize, 0)
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _get_locked(self, key: Hashable) -> Tuple[bool, Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._data[key]
+            return False, None
+        self._data.move_to_end(key)
+        return True, value
+
+    def _set_locked(self, key: Hashable, value: Any) -> None:
+        if self.maxsize == 0:
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self._evictions += 1
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            found, value = self._get_locked(key)
+            if found:
+                self._hits += 1
+                return value
+            self._misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._set_locked(key, value)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for key, calling loader() on a miss.
+        Concurrent misses for the same key wait for a single load instead of each calling loader().
+        """
+        while True:
+            with self._lock:
+                found, value = self._get_locked(key)
+                if found:
+                    self._hits += 1
+                    return value
+                pending = self._inflight.get(key)
+                if pending is None:
+                    self._misses += 1
+                    pending = threading.Event()
+                    self._inflight[key] = pending
+                    break
+            # Another thread is loading this key; use its result (or retry if it failed)
+            pending.wait()
+
+        try:
+            value = loader()
+            with self._lock:
+                self._set_locked(key, value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            pending.set()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+            }
@@ -1,31 +1,171 @@
 from typing import List, Tuple
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, case, exists, func, select
+from sqlalchemy.orm import Session, aliased
 
 from app.models.placement import Placement
 from app.models.snapshot import Snapshot
 
 
-def get_playlist_ids_from_snapshot(snapshot_id: int, db: Session) -> set[int]:
-    placements = (
-        db.query(Placement)
-        .filter(Placement.snapshot_id == snapshot_id)
+def record_changes(
+    snapshot: Snapshot,
+    previous_snapshot_id: int | None,
+    previous_playlist_ids: set[int],
+    current_playlist_ids: set[int],
+) -> Tuple[List[int], List[int]]:
+    """Store the gained/lost summary on snapshot (not committed) and return (gained, lost)."""
+    if previous_snapshot_id is None:
+        gained, lost = [], []
+    else:
+        gained = sorted(current_playlist_ids - previous_playlist_ids)
+        lost = sorted(previous_playlist_ids - current_playlist_ids)
+    snapshot.previous_snapshot_id = previous_snapshot_id
+    snapshot.gained_playlist_ids = gained
+    snapshot.lost_playlist_ids = lost
+    snapshot.gained_count = len(gained)
+    snapshot.lost_count = len(lost)
+    return gained, lost
+
+
+def backfill_snapshot_changes(db: Session) -> int:
+    """
+    Compute the stored change summary for snapshots written before it existed.
+    Walks each affected artist's snapshots once in order; returns the number of snapshots updated.
+    """
+    artist_ids = [
+        row[0]
+        for row in db.query(Snapshot.artist_id)
+        .filter(Snapshot.gained_count.is_(None))
+        .distinct()
         .all()
+    ]
+    updated = 0
+    for artist_id in artist_ids:
+        snapshots = (
+            db.query(Snapshot)
+            .filter(Snapshot.artist_id == artist_id)
+            .order_by(Snapshot.snapshot_time, Snapshot.id)
+            .all()
+        )
+        playlists_by_snapshot: dict[int, set[int]] = {}
+        for snapshot_id, playlist_id in (
+            db.query(Placement.snapshot_id, Placement.playlist_id)
+            .filter(Placement.artist_id == artist_id)
+            .all()
+        ):
+            playlists_by_snapshot.setdefault(snapshot_id, set()).add(playlist_id)
+
+        previous = None
+        for snapshot in snapshots:
+            current_ids = playlists_by_snapshot.get(snapshot.id, set())
+            if snapshot.gained_count is None:
+                record_changes(
+                    snapshot,
+                    previous.id if previous else None,
+                    playlists_by_snapshot.get(previous.id, set()) if previous else set(),
+                    current_ids,
+                )
+                updated += 1
+            previous = snapshot
+        db.commit()
+    return updated
+
+
+def stream_change_counts(snapshots: List[Snapshot], db: Session) -> dict[int, Tuple[int, int]]:
+    """
+    (gained_count, lost_count) per snapshot for a contiguous run of one artist's snapshots,
+    ordered oldest first. Stored summaries are used as-is; the rest are diffed against their
+    neighbour in a single streamed pass over placements (no per-pair queries).
+    """
+    counts = {
+        s.id: (s.gained_count, s.lost_count)
+        for s in snapshots
+        if s.gained_count is not None
+    }
+    missing = [s for s in snapshots if s.gained_count is None]
+    if not missing:
+        return counts
+
+    # Predecessor of the oldest snapshot in the run, via lag() rather than comparing
+    # timestamps (SQLite stores server-default times without microseconds)
+    oldest = snapshots[0]
+    series = (
+        select(
+            Snapshot.id.label("id"),
+            func.lag(Snapshot.id)
+            .over(order_by=(Snapshot.snapshot_time, Snapshot.id))
+            .label("previous_id"),
+        )
+        .where(Snapshot.artist_id == oldest.artist_id)
+        .subquery()
     )
-    return {p.playlist_id for p in placements}
+    predecessor_id = db.execute(
+        select(series.c.previous_id).where(series.c.id == oldest.id)
+    ).scalar()
+    ordered_ids = ([predecessor_id] if predecessor_id else []) + [s.id for s in snapshots]
+    missing_ids = {s.id for s in missing}
 
+    # Placements arrive grouped by snapshot in series order; only two neighbouring sets are held
+    rows = iter(db.execute(
+        select(Placement.snapshot_id, Placement.playlist_id)
+        .join(Snapshot, Snapshot.id == Placement.snapshot_id)
+        .where(Placement.snapshot_id.in_(ordered_ids))
+        .order_by(Snapshot.snapshot_time, Snapshot.id)
+        .execution_options(yield_per=1000)
+    ))
+    pending = next(rows, None)
+    previous_ids = None
+    for snapshot_id in ordered_ids:
+        current_ids = set()
+        while pending is not None and pending[0] == snapshot_id:
+            current_ids.add(pending[1])
+            pending = next(rows, None)
+        if snapshot_id in missing_ids:
+            if previous_ids is None:
+                counts[snapshot_id] = (0, 0)  # First snapshot of the artist
+            else:
+                counts[snapshot_id] = (
+                    len(current_ids - previous_ids),
+                    len(previous_ids - current_ids),
+                )
+        previous_ids = current_ids
+    return counts
 
-def calculate_changes(
-    previous_snapshot_id: int | None,
-    current_snapshot_id: int,
-    db: Session,
-) -> Tuple[List[int], List[int]]:
-    if not previous_snapshot_id:
-        return [], []
-    
-    previous_playlists = get_playlist_ids_from_snapshot(previous_snapshot_id, db)
-    current_playlists = get_playlist_ids_from_snapshot(current_snapshot_id, db)
-    
-    gained = list(current_playlists - previous_playlists)
-    lost = list(previous_playlists - current_playlists)
-    
+
+def count_changes_sql(current_snapshot_id, previous_snapshot_id):
+    """
+    SQL expressions (gained_count, lost_count) comparing two snapshot id columns,
+    for computing changes inside a larger query instead of loading placements into Python.
+    """
+    current = aliased(Placement)
+    previous = aliased(Placement)
+
+    def _count_missing(snapshot_id, other_snapshot_id, outer, inner):
+        return (
+            select(func.count(func.distinct(outer.playlist_id)))
+            .where(outer.snapshot_id == snapshot_id)
+            .where(
+                ~exists()
+                .where(
+                    and_(
+                        inner.snapshot_id == other_snapshot_id,
+                        inner.playlist_id == outer.playlist_id,
+                    )
+                )
+                # The snapshot id columns come from the enclosing query, two levels up
+                .correlate_except(inner)
+            )
+            .correlate_except(outer)
+            .scalar_subquery()
+        )
+
+    # Like record_changes, a snapshot without a predecessor has no changes
+    no_previous = previous_snapshot_id.is_(None)
+    gained = case(
+        (no_previous, 0),
+        else_=_count_missing(current_snapshot_id, previous_snapshot_id, current, previous),
+    )
+    lost = case(
+        (no_previous, 0),
+        else_=_count_missing(previous_snapshot_id, current_snapshot_id, previous, current),
+    )
     return gained, lost
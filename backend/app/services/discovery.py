@@ -1,17 +1,22 @@
-from typing import List, Set
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Set
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-import time
 
+from app.core.config import settings
 from app.models.playlist import Playlist, PlaylistType
 from app.services.spotify_client import (
     get_artist,
     get_artist_top_tracks,
     search_playlists,
-    get_playlist,
-    get_playlist_tracks,
+    get_playlist_artist_counts,
 )
 
 
+# Rows per INSERT ... ON CONFLICT statement; keeps bound parameters under SQLite's limit
+_UPSERT_BATCH_SIZE = 500
+
+
 def classify_playlist(owner_id: str | None, name: str) -> PlaylistType:
     if owner_id == "spotify":
         return PlaylistType.EDITORIAL
@@ -31,7 +36,21 @@ def classify_playlist(owner_id: str | None, name: str) -> PlaylistType:
     return PlaylistType.USER_GENERATED
 
 
-def discover_playlists(artist_id: str, db: Session, max_playlists: int = 50) -> List[dict]:
+def discover_playlists(
+    artist_id: str,
+    db: Session,
+    max_playlists: int = 50,
+    on_progress: Callable[[float], None] | None = None,
+    previous: Dict[str, dict] | None = None,
+) -> List[dict]:
+    """
+    Find candidate playlists via search and verify each one.
+    on_progress, if given, is called with a fraction in [0, 1] as stages complete.
+    previous maps spotify_playlist_id -> {"tracks_count", "total_tracks", "source_marker"} from the
+    artist's last snapshot; candidates whose search result still carries the same marker are not
+    fetched again and keep their previous counts.
+    """
+    report = on_progress or (lambda fraction: None)
     try:
         artist_data = get_artist(artist_id)
         artist_name = artist_data["name"]
@@ -39,147 +58,245 @@ def discover_playlists(artist_id: str, db: Session, max_playlists: int = 50) ->
         print(f"Error getting artist {artist_id}: {e}")
         return []
     
-    discovered = {}
+    report(0.05)
     max_per_source = max_playlists // 2
     
-    # Search by artist name
-    search_by_artist = f'artist:"{artist_name}"'
-    try:
-        playlists_by_artist = search_playlists(search_by_artist, limit=max_per_source)
-        print(f"Found {len(playlists_by_artist)} playlists by artist search")
-    except Exception as e:
-        print(f"Error searching playlists by artist: {e}")
-        playlists_by_artist = []
-    
-    for playlist in playlists_by_artist:
-        playlist_id = playlist.get("id")
-        if playlist_id and playlist_id not in discovered:
-            discovered[playlist_id] = playlist
-    
-    # Search by top tracks
-    try:
-        top_tracks = get_artist_top_tracks(artist_id, market="US")
-        print(f"Found {len(top_tracks)} top tracks")
-    except Exception as e:
-        print(f"Error getting top tracks: {e}")
-        top_tracks = []
-    
-    for track in top_tracks[:5]:
-        track_name = track.get("name", "")
-        if not track_name:
-            continue
-        search_query = f'track:"{track_name}" artist:"{artist_name}"'
-        try:
-            playlists_by_track = search_playlists(search_query, limit=10)
-            print(f"Found {len(playlists_by_track)} playlists for track '{track_name}'")
-        except Exception as e:
-            print(f"Error searching playlists by track: {e}")
-            playlists_by_track = []
+    with ThreadPoolExecutor(
+        max_workers=max(1, settings.DISCOVERY_MAX_WORKERS),
+        thread_name_prefix="search",
+    ) as executor:
+        # Artist search and top tracks don't depend on each other; start both at once
+        by_artist_future = executor.submit(
+            _search_playlists_safely, f'artist:"{artist_name}"', max_per_source
+        )
+        top_tracks_future = executor.submit(_get_top_tracks_safely, artist_id)
+        
+        # Track searches fan out as soon as top tracks are known
+        track_names = [
+            track.get("name", "") for track in top_tracks_future.result()[:5]
+        ]
+        by_track_futures = [
+            executor.submit(
+                _search_playlists_safely,
+                f'track:"{track_name}" artist:"{artist_name}"',
+                10,
+            )
+            for track_name in track_names
+            if track_name
+        ]
         
-        for playlist in playlists_by_track:
+        # Merge in query order (artist search first, then tracks) so output is deterministic
+        discovered = {}
+        for playlist in by_artist_future.result():
             playlist_id = playlist.get("id")
-            if playlist_id and playlist_id not in discovered and len(discovered) < max_playlists:
+            if playlist_id and playlist_id not in discovered:
                 discovered[playlist_id] = playlist
-                if len(discovered) >= max_playlists:
-                    break
         
-        if len(discovered) >= max_playlists:
-            break
-        time.sleep(0.05)  # Reduced delay
+        # Every search is already in flight by now; max_playlists only caps what gets merged
+        for future in by_track_futures:
+            if len(discovered) >= max_playlists:
+                break
+            for playlist in future.result():
+                playlist_id = playlist.get("id")
+                if playlist_id and playlist_id not in discovered:
+                    discovered[playlist_id] = playlist
+                    if len(discovered) >= max_playlists:
+                        break
     
     print(f"Total discovered playlists before verification: {len(discovered)}")
-    
-    verified_playlists = []
+    report(0.3)
     
     # Limit verification to reasonable number to avoid too many API calls
     max_to_verify = min(max_playlists, 50)  # Verify up to 50 playlists max
+    candidates = list(discovered)[:max_to_verify]
     
-    def _artist_id_from_track_artist(track_artist: dict) -> str | None:
-        """Extract artist id from track artist (id or uri like spotify:artist:xxx)."""
-        if not track_artist:
-            return None
-        aid = track_artist.get("id")
-        if aid:
-            return str(aid)
-        uri = track_artist.get("uri", "")
-        if isinstance(uri, str) and "artist:" in uri:
-            return uri.split("artist:")[-1].strip()
-        return None
+    unchanged = {}
+    if previous and settings.DISCOVERY_REUSE_UNCHANGED:
+        for playlist_id in candidates:
+            known = previous.get(playlist_id)
+            marker = discovered[playlist_id].get("snapshot_id")
+            if known is not None and marker and known.get("source_marker") == marker:
+                unchanged[playlist_id] = _carry_forward(playlist_id, discovered[playlist_id], known)
+        if unchanged:
+            print(f"Skipping verification of {len(unchanged)} unchanged playlists")
     
-    for playlist_id, playlist_data in list(discovered.items())[:max_to_verify]:
-        try:
-            full_playlist = get_playlist(playlist_id)
-            tracks = get_playlist_tracks(playlist_id, limit=100, artist_id=artist_id)
-            # Total tracks in playlist (from API when available)
-            total_tracks = full_playlist.get("tracks", {}).get("total")
-            if total_tracks is not None:
-                total_tracks = int(total_tracks)
-            else:
-                total_tracks = len(tracks) if tracks else 0
-            
-            # Count tracks that are by this artist (id or uri match).
-            artist_id_str = str(artist_id)
-            tracks_count = 0
-            for track in tracks:
-                if not track or not track.get("artists"):
-                    continue
-                for track_artist in track["artists"]:
-                    tid = _artist_id_from_track_artist(track_artist)
-                    if tid and tid == artist_id_str:
-                        tracks_count += 1
-                        break
-
-            verified_playlists.append({
-                "spotify_playlist_id": playlist_id,
-                "name": full_playlist.get("name", "Unknown"),
-                "owner_id": full_playlist.get("owner", {}).get("id"),
-                "owner_name": full_playlist.get("owner", {}).get("display_name"),
-                "follower_count": full_playlist.get("followers", {}).get("total", 0),
-                "tracks_count": tracks_count,
-                "total_tracks": total_tracks,
-            })
-            print(f"Included playlist: {full_playlist.get('name')} (total={total_tracks}, by artist={tracks_count})")
-            
-            if len(verified_playlists) >= max_playlists:
-                break
-            
-            # Reduced delay - only 0.05s between playlist checks
-            time.sleep(0.05)
-        except Exception as e:
-            print(f"Error verifying playlist {playlist_id}: {e}")
-            continue
+    verified_playlists = verify_playlists(
+        artist_id,
+        [playlist_id for playlist_id in candidates if playlist_id not in unchanged],
+        on_progress=lambda fraction: report(0.3 + 0.7 * fraction),
+    )
     
     print(f"Total verified playlists: {len(verified_playlists)}")
-    return verified_playlists
+    if not unchanged:
+        return verified_playlists
+    # Keep candidate order, as if every playlist had been verified
+    by_id = {pl["spotify_playlist_id"]: pl for pl in verified_playlists}
+    by_id.update(unchanged)
+    return [by_id[playlist_id] for playlist_id in candidates if playlist_id in by_id]
 
 
-def get_or_create_playlist(
-    spotify_playlist_id: str,
-    name: str,
-    owner_id: str | None, 
-    owner_name: str | None,
-    follower_count: int | None,
-    db: Session,
-) -> Playlist:
-    playlist = (
-        db.query(Playlist)
-        .filter(Playlist.spotify_playlist_id == spotify_playlist_id)
-        .first()
-    )
-    
-    if playlist:
-        return playlist
+def _search_playlists_safely(query: str, limit: int) -> List[dict]:
+    try:
+        playlists = search_playlists(query, limit=limit)
+        print(f"Found {len(playlists)} playlists for query {query}")
+        return playlists
+    except Exception as e:
+        print(f"Error searching playlists for query {query}: {e}")
+        return []
+
+
+def _get_top_tracks_safely(artist_id: str) -> List[dict]:
+    try:
+        top_tracks = get_artist_top_tracks(artist_id, market="US")
+        print(f"Found {len(top_tracks)} top tracks")
+        return top_tracks
+    except Exception as e:
+        print(f"Error getting top tracks: {e}")
+        return []
+
+
+def _carry_forward(playlist_id: str, playlist: dict, known: dict) -> dict:
+    """
+    Discovery entry for an unchanged playlist: details from the search result, counts from before.
+    Search keys read here must be in spotify_client.SEARCH_PLAYLIST_FIELDS.
+    """
+    return {
+        "spotify_playlist_id": playlist_id,
+        "name": playlist.get("name", "Unknown"),
+        "owner_id": playlist.get("owner", {}).get("id"),
+        "owner_name": playlist.get("owner", {}).get("display_name"),
+        # Search results may omit followers; None keeps the stored count
+        "follower_count": (playlist.get("followers") or {}).get("total"),
+        "tracks_count": known["tracks_count"],
+        "total_tracks": known["total_tracks"],
+        "source_marker": known["source_marker"],
+    }
+
+
+def _verify_playlist(playlist_id: str, artist_id: str) -> dict:
+    """Fetch a playlist and count the artist's tracks; keys read must be in spotify_client.PLAYLIST_FIELDS."""
+    # Every track is read (page by page), so artists deep in long playlists are counted too
+    full_playlist, artist_counts, scanned = get_playlist_artist_counts(playlist_id, artist_id=artist_id)
+    # Total tracks in playlist (from API when available)
+    total_tracks = (full_playlist.get("tracks") or {}).get("total")
+    if total_tracks is not None:
+        total_tracks = int(total_tracks)
+    else:
+        total_tracks = scanned
     
-    playlist_type = classify_playlist(owner_id, name)
+    # Tracks that are by this artist (id or uri match)
+    tracks_count = artist_counts.get(str(artist_id), 0)
+
+    print(f"Checked playlist: {full_playlist.get('name')} (total={total_tracks}, by artist={tracks_count})")
+    return {
+        "spotify_playlist_id": playlist_id,
+        "name": full_playlist.get("name", "Unknown"),
+        "owner_id": full_playlist.get("owner", {}).get("id"),
+        "owner_name": full_playlist.get("owner", {}).get("display_name"),
+        "follower_count": full_playlist.get("followers", {}).get("total", 0),
+        "tracks_count": tracks_count,
+        "total_tracks": total_tracks,
+        "source_marker": full_playlist.get("snapshot_id"),
+    }
+
+
+def verify_playlists(
+    artist_id: str,
+    playlist_ids: List[str],
+    max_workers: int | None = None,
+    on_progress: Callable[[float], None] | None = None,
+) -> List[dict]:
+    """
+    Fetch and count artist tracks for each candidate playlist on a bounded worker pool.
+    Results keep the order of playlist_ids; a failing playlist is logged and skipped, and so is
+    one without any tracks by the artist (the single inclusion rule for every refresh mode).
+    on_progress, if given, is called with the fraction of playlists checked so far.
+    """
+    if not playlist_ids:
+        return []
     
-    playlist = Playlist(
-        spotify_playlist_id=spotify_playlist_id,
-        name=name,
-        owner_id=owner_id,
-        owner_name=owner_name,
-        playlist_type=playlist_type,
-        follower_count=follower_count,
+    workers = max(1, min(max_workers or settings.DISCOVERY_MAX_WORKERS, len(playlist_ids)))
+    verified_playlists = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="verify") as executor:
+        futures = [executor.submit(_verify_playlist, pid, artist_id) for pid in playlist_ids]
+        for checked, (playlist_id, future) in enumerate(zip(playlist_ids, futures), start=1):
+            try:
+                verified = future.result()
+                if verified["tracks_count"] > 0:
+                    verified_playlists.append(verified)
+            except Exception as e:
+                print(f"Error verifying playlist {playlist_id}: {e}")
+            if on_progress:
+                on_progress(checked / len(playlist_ids))
+    return verified_playlists
+
+
+def _insert_for_dialect(db: Session):
+    """Dialect-specific insert() supporting ON CONFLICT, or None if the backend has none."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        return None
+    return insert
+
+
+def upsert_playlists(discovered: List[dict], db: Session) -> Dict[str, int]:
+    """
+    Insert or refresh the playlists for discovered entries and return {spotify_playlist_id: playlist id}.
+    New playlists are classified on insert; existing ones get their current name, owner name and
+    follower count. Uses INSERT ... ON CONFLICT so concurrent refreshes cannot race on the unique id.
+    """
+    rows: Dict[str, dict] = {}
+    for pl in discovered:
+        rows[pl["spotify_playlist_id"]] = {
+            "spotify_playlist_id": pl["spotify_playlist_id"],
+            "name": pl["name"],
+            "owner_id": pl.get("owner_id"),
+            "owner_name": pl.get("owner_name"),
+            "playlist_type": classify_playlist(pl.get("owner_id"), pl["name"]),
+            "follower_count": pl.get("follower_count"),
+        }
+    if not rows:
+        return {}
+
+    values = list(rows.values())
+    insert = _insert_for_dialect(db)
+    if insert is not None:
+        for start in range(0, len(values), _UPSERT_BATCH_SIZE):
+            stmt = insert(Playlist).values(values[start:start + _UPSERT_BATCH_SIZE])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Playlist.spotify_playlist_id],
+                set_={
+                    "name": stmt.excluded.name,
+                    "owner_name": func.coalesce(stmt.excluded.owner_name, Playlist.owner_name),
+                    # Keep the last known count when the provider does not report one
+                    "follower_count": func.coalesce(stmt.excluded.follower_count, Playlist.follower_count),
+                    "updated_at": func.now(),
+                },
+            )
+            db.execute(stmt)
+    else:
+        existing = {
+            pl.spotify_playlist_id: pl
+            for pl in db.query(Playlist).filter(Playlist.spotify_playlist_id.in_(rows)).all()
+        }
+        for spotify_playlist_id, row in rows.items():
+            playlist = existing.get(spotify_playlist_id)
+            if playlist is None:
+                db.add(Playlist(**row))
+                continue
+            playlist.name = row["name"]
+            if row["owner_name"] is not None:
+                playlist.owner_name = row["owner_name"]
+            if row["follower_count"] is not None:
+                playlist.follower_count = row["follower_count"]
+        db.flush()
+
+    return dict(
+        db.query(Playlist.spotify_playlist_id, Playlist.id)
+        .filter(Playlist.spotify_playlist_id.in_(rows))
+        .all()
     )
-    db.add(playlist)
-    db.flush()
-    return playlist
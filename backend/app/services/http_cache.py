@@ -0,0 +1,163 @@
+"""
+Persistent conditional-request cache for provider GETs.
+Stores the ETag and raw body of each response in a local SQLite file; later requests for the
+same URL send If-None-Match and a 304 is answered from the stored body without a download.
+Shared by all threads (and processes using the same file).
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+import requests
+
+from app.core.config import settings
+
+# Prune expired/excess entries after this many stores
+_PRUNE_EVERY = 500
+
+
+class ResponseCache:
+    def __init__(self, path: str, max_entries: int, max_age_seconds: float):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._stores_since_prune = 0
+        self._not_modified = 0
+        self._stored = 0
+        self._bytes_saved = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, etag TEXT NOT NULL, body BLOB NOT NULL,"
+                " stored_at REAL NOT NULL, used_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_responses_used_at ON responses (used_at)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def lookup(self, key: str) -> Optional[Tuple[str, bytes]]:
+        """(etag, body) stored for key, if any and not older than max_age_seconds."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT etag, body FROM responses WHERE key = ? AND stored_at >= ?",
+                (key, time.time() - self.max_age_seconds),
+            ).fetchone()
+        return (row[0], bytes(row[1])) if row else None
+
+    def mark_not_modified(self, key: str, body_size: int) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "UPDATE responses SET stored_at = ?, used_at = ? WHERE key = ?",
+                (time.time(), time.time(), key),
+            )
+            conn.commit()
+            self._not_modified += 1
+            self._bytes_saved += body_size
+
+    def store(self, key: str, etag: str, body: bytes) -> None:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, etag, body, stored_at, used_at) VALUES (?, ?, ?, ?, ?)",
+                (key, etag, body, now, now),
+            )
+            self._stored += 1
+            self._stores_since_prune += 1
+            if self._stores_since_prune >= _PRUNE_EVERY:
+                self._prune_locked(conn, now)
+            conn.commit()
+
+    def _prune_locked(self, conn: sqlite3.Connection, now: float) -> None:
+        self._stores_since_prune = 0
+        conn.execute("DELETE FROM responses WHERE stored_at < ?", (now - self.max_age_seconds,))
+        conn.execute(
+            "DELETE FROM responses WHERE key IN ("
+            " SELECT key FROM responses ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+            (max(self.max_entries, 0),),
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._connect().execute("SELECT COUNT(*) FROM responses").fetchone()[0] if self.enabled else 0
+            return {
+                "entries": entries,
+                "not_modified": self._not_modified,
+                "stored": self._stored,
+                "bytes_saved": self._bytes_saved,
+            }
+
+
+response_cache = ResponseCache(
+    settings.PROVIDER_HTTP_CACHE_PATH,
+    max_entries=settings.PROVIDER_HTTP_CACHE_MAX_ENTRIES,
+    max_age_seconds=settings.PROVIDER_HTTP_CACHE_MAX_AGE_DAYS * 86400,
+)
+
+
+def _cache_key(provider: str, url: str, params: Optional[dict]) -> str:
+    query = urlencode(sorted((params or {}).items()), doseq=True)
+    return f"{provider} {url}?{query}"
+
+
+def get_json(
+    provider: str,
+    url: str,
+    params: Optional[dict],
+    send: Callable[[Dict[str, str]], requests.Response],
+) -> Any:
+    """
+    GET url through send(extra_headers) and return the parsed JSON body, revalidating a stored
+    copy with If-None-Match. Raises requests.HTTPError for error responses like raise_for_status().
+    """
+    if not response_cache.enabled:
+        response = send({})
+        response.raise_for_status()
+        return response.json()
+
+    key = _cache_key(provider, url, params)
+    try:
+        cached = response_cache.lookup(key)
+    except sqlite3.Error as e:
+        print(f"[http_cache] Lookup failed, sending unconditional request: {e}")
+        cached = None
+
+    response = send({"If-None-Match": cached[0]} if cached else {})
+    if response.status_code == 304 and cached is not None:
+        try:
+            response_cache.mark_not_modified(key, len(cached[1]))
+        except sqlite3.Error as e:
+            print(f"[http_cache] Could not update entry: {e}")
+        return json.loads(cached[1])
+
+    response.raise_for_status()
+    etag = response.headers.get("ETag")
+    if etag and response.status_code == 200:
+        try:
+            response_cache.store(key, etag, response.content)
+        except sqlite3.Error as e:
+            print(f"[http_cache] Could not store response: {e}")
+    return response.json()
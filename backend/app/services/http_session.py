@@ -0,0 +1,91 @@
+"""
+Long-lived HTTP sessions for music API clients.
+Each provider client owns one pooled keep-alive session, shared by all worker threads.
+"""
+
+import threading
+from typing import Dict, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.core.config import settings
+
+
+def request_timeout() -> Tuple[float, float]:
+    """(connect, read) timeout for provider requests."""
+    return (settings.PROVIDER_HTTP_CONNECT_TIMEOUT, settings.PROVIDER_HTTP_READ_TIMEOUT)
+
+
+def split_page_url(url: str, base_url: str) -> Tuple[str, dict]:
+    """(endpoint, params) of an absolute next-page link returned by a provider under base_url."""
+    parts = urlsplit(url)
+    endpoint = f"{parts.scheme}://{parts.netloc}{parts.path}"
+    if not endpoint.startswith(base_url):
+        raise ValueError(f"Unexpected page URL: {url}")
+    return endpoint[len(base_url):], dict(parse_qsl(parts.query))
+
+
+def build_session() -> requests.Session:
+    """
+    Create a session with a bounded connection pool and connection-level retries.
+    HTTP status retries (429/5xx) are left to rate_limit.send_with_rate_limit.
+    """
+    retries = Retry(
+        total=None,
+        connect=settings.PROVIDER_HTTP_CONNECT_RETRIES,
+        read=settings.PROVIDER_HTTP_CONNECT_RETRIES,
+        status=0,
+        other=0,
+        allowed_methods=frozenset({"GET"}),
+        backoff_factor=0.2,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=settings.PROVIDER_HTTP_POOL_SIZE,
+        pool_block=True,
+        max_retries=retries,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class ClientSession:
+    """Lazily created, process-wide session for one provider."""
+
+    def __init__(self):
+        self._session: requests.Session | None = None
+        self._lock = threading.Lock()
+
+    def get(self) -> requests.Session:
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = build_session()
+        return self._session
+
+    def stats(self) -> Dict[str, int]:
+        """Requests sent vs. TCP connections opened; the difference is keep-alive reuse."""
+        session = self._session
+        requests_sent = 0
+        connections_opened = 0
+        if session is not None:
+            adapters = {id(a): a for a in session.adapters.values()}.values()
+            for adapter in adapters:
+                pools = adapter.poolmanager.pools
+                for key in pools.keys():
+                    pool = pools.get(key)
+                    if pool is None:
+                        continue
+                    requests_sent += pool.num_requests
+                    connections_opened += pool.num_connections
+        return {
+            "requests": requests_sent,
+            "connections_opened": connections_opened,
+            "connections_reused": max(requests_sent - connections_opened, 0),
+        }
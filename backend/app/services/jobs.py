@@ -0,0 +1,162 @@
+"""
+In-process background jobs for long-running artist refreshes.
+Jobs run on a bounded executor so web workers stay free; state is kept in memory (per process).
+"""
+
+import enum
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+
+
+class JobState(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class JobQueueFull(Exception):
+    """Raised when JOB_MAX_PENDING jobs are already queued or running."""
+
+
+class Job:
+    def __init__(self, kind: str, user_id: int | None, artist_id: int | None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.user_id = user_id
+        self.artist_id = artist_id
+        self.state = JobState.QUEUED
+        self.progress = 0.0
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now(timezone.utc)
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self._finished_monotonic: Optional[float] = None
+
+    @property
+    def is_active(self) -> bool:
+        return self.state in (JobState.QUEUED, JobState.RUNNING)
+
+    def set_progress(self, fraction: float) -> None:
+        self.progress = round(min(max(fraction, 0.0), 1.0), 3)
+
+
+_jobs: Dict[str, Job] = {}
+_jobs_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+# Refreshes in flight per artist, whichever path started them (jobs or synchronous routes)
+_refresh_counts: Dict[int, int] = {}
+_refresh_locks: Dict[int, threading.Lock] = {}
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=max(1, settings.JOB_MAX_WORKERS),
+            thread_name_prefix="job",
+        )
+    return _executor
+
+
+def _prune_locked() -> None:
+    cutoff = time.monotonic() - settings.JOB_RESULT_TTL_SECONDS
+    expired = [
+        job_id for job_id, job in _jobs.items()
+        if job._finished_monotonic is not None and job._finished_monotonic < cutoff
+    ]
+    for job_id in expired:
+        del _jobs[job_id]
+
+
+def _run(job: Job, fn: Callable[[Job], Any]) -> None:
+    job.state = JobState.RUNNING
+    job.started_at = datetime.now(timezone.utc)
+    try:
+        job.result = fn(job)
+        job.progress = 1.0
+        job.state = JobState.SUCCEEDED
+    except ValueError as e:
+        job.error = str(e) or "Music API credentials not configured"
+        job.state = JobState.FAILED
+    except Exception as e:
+        print(f"[jobs] {job.kind} job {job.id} failed: {e}")
+        job.error = "Failed to fetch artist or discover playlists. Check provider credentials and URL."
+        job.state = JobState.FAILED
+    finally:
+        job.finished_at = datetime.now(timezone.utc)
+        job._finished_monotonic = time.monotonic()
+
+
+def submit_job(
+    kind: str,
+    fn: Callable[[Job], Any],
+    user_id: int | None = None,
+    artist_id: int | None = None,
+) -> Job:
+    """
+    Queue fn(job) on the job executor and return the job immediately.
+    If a job for the same artist is already queued or running, that job is returned instead.
+    """
+    with _jobs_lock:
+        _prune_locked()
+        if artist_id is not None:
+            for existing in _jobs.values():
+                if existing.artist_id == artist_id and existing.is_active:
+                    return existing
+        active = sum(1 for j in _jobs.values() if j.is_active)
+        if active >= settings.JOB_MAX_PENDING:
+            raise JobQueueFull("Too many refresh jobs in progress, try again later")
+        job = Job(kind, user_id, artist_id)
+        _jobs[job.id] = job
+    _get_executor().submit(_run, job, fn)
+    return job
+
+
+def get_job(job_id: str) -> Optional[Job]:
+    with _jobs_lock:
+        return _jobs.get(job_id)
+
+
+@contextmanager
+def artist_refresh_guard(artist_id: int):
+    """
+    Mark a refresh of artist_id as in flight for its duration, running it only after any other
+    refresh of the same artist finishes so each snapshot is diffed against the one before it.
+    """
+    with _jobs_lock:
+        _refresh_counts[artist_id] = _refresh_counts.get(artist_id, 0) + 1
+        lock = _refresh_locks.setdefault(artist_id, threading.Lock())
+    try:
+        with lock:
+            yield
+    finally:
+        with _jobs_lock:
+            _refresh_counts[artist_id] -= 1
+            if not _refresh_counts[artist_id]:
+                del _refresh_counts[artist_id]
+                del _refresh_locks[artist_id]
+
+
+def is_artist_refresh_active(artist_id: int) -> bool:
+    """True while a refresh of artist_id is queued as a job or running on any path."""
+    with _jobs_lock:
+        return artist_id in _refresh_counts or any(
+            j.artist_id == artist_id and j.is_active for j in _jobs.values()
+        )
+
+
+def shutdown() -> None:
+    """Stop accepting work; queued jobs are dropped, running jobs finish in the background."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
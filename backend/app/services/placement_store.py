@@ -0,0 +1,170 @@
+"""
+Placement storage for snapshots.
+
+Keyframe snapshots (delta_depth 0 or NULL) store every placement. With PLACEMENT_STORAGE_MODE=delta,
+a snapshot instead stores only the placements added or changed since its predecessor
+(previous_snapshot_id), plus a removed=True marker row per playlist that dropped out; every
+PLACEMENT_KEYFRAME_INTERVAL snapshots a full keyframe is written again to bound the replay chain.
+
+Read placement state through snapshot_state()/snapshot_placements(), which rebuild it
+either way. Delta snapshots always carry the stored change summary (recorded in the same
+transaction), so the SQL and streaming diff fallbacks in diffing never see delta rows.
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.placement import Placement
+from app.models.snapshot import Snapshot
+
+
+def _chain_placements(snapshot_id: int, db: Session) -> List[Placement]:
+    """
+    Placement rows of snapshot_id and every delta ancestor back to its keyframe, keyframe first,
+    in one query (recursive CTE along previous_snapshot_id).
+    """
+    chain = (
+        select(Snapshot.id, Snapshot.previous_snapshot_id, Snapshot.delta_depth)
+        .where(Snapshot.id == snapshot_id)
+        .cte("placement_chain", recursive=True)
+    )
+    parent = select(Snapshot.id, Snapshot.previous_snapshot_id, Snapshot.delta_depth).join(
+        chain, Snapshot.id == chain.c.previous_snapshot_id
+    ).where(func.coalesce(chain.c.delta_depth, 0) > 0)
+    chain = chain.union_all(parent)
+    return (
+        db.query(Placement)
+        .join(chain, chain.c.id == Placement.snapshot_id)
+        .order_by(func.coalesce(chain.c.delta_depth, 0), Placement.id)
+        .all()
+    )
+
+
+def snapshot_state(snapshot_id: int, db: Session) -> Dict[int, Placement]:
+    """playlist_id -> placement for the full state of a snapshot, in placement order."""
+    state: Dict[int, Placement] = {}
+    for placement in _chain_placements(snapshot_id, db):
+        if placement.removed:
+            state.pop(placement.playlist_id, None)
+        else:
+            state[placement.playlist_id] = placement
+    return state
+
+
+def snapshot_placements(snapshot_id: int, db: Session) -> List[Placement]:
+    """
+    Placements making up a snapshot. For delta snapshots some rows belong to ancestor snapshots;
+    callers should only rely on playlist_id, tracks_count and total_tracks.
+    """
+    return list(snapshot_state(snapshot_id, db).values())
+
+
+def snapshot_placements_page(
+    snapshot: Snapshot,
+    after_playlist_id: int | None,
+    limit: int | None,
+    db: Session,
+) -> List[Placement]:
+    """
+    Placements of a snapshot ordered by playlist_id, starting after after_playlist_id, at most
+    limit + 1 of them (the extra one tells the caller there is a next page). Keyframes page in
+    SQL on (snapshot_id, playlist_id); delta snapshots are rebuilt first.
+    """
+    if not snapshot.delta_depth:
+        query = db.query(Placement).filter(Placement.snapshot_id == snapshot.id)
+        if after_playlist_id is not None:
+            query = query.filter(Placement.playlist_id > after_playlist_id)
+        query = query.order_by(Placement.playlist_id)
+        if limit is not None:
+            query = query.limit(limit + 1)
+        return query.all()
+    placements = sorted(snapshot_state(snapshot.id, db).values(), key=lambda p: p.playlist_id)
+    if after_playlist_id is not None:
+        placements = [p for p in placements if p.playlist_id > after_playlist_id]
+    return placements[: limit + 1] if limit is not None else placements
+
+
+def _changed(previous: Placement, row: dict) -> bool:
+    return (
+        previous.tracks_count != row.get("tracks_count")
+        or previous.total_tracks != row.get("total_tracks")
+        or previous.source_marker != row.get("source_marker")
+    )
+
+
+def next_delta_depth(previous: Snapshot | None) -> int:
+    """delta_depth for a snapshot following previous under the current settings (0 = keyframe)."""
+    if previous is None or settings.PLACEMENT_STORAGE_MODE.strip().lower() != "delta":
+        return 0
+    depth = (previous.delta_depth or 0) + 1
+    return depth if depth < max(settings.PLACEMENT_KEYFRAME_INTERVAL, 1) else 0
+
+
+def state_to_rows(snapshot: Snapshot, state: Dict[int, Placement]) -> List[dict]:
+    """Full placement rows for snapshot from a rebuilt state."""
+    return [
+        {
+            "artist_id": snapshot.artist_id,
+            "playlist_id": playlist_id,
+            "snapshot_id": snapshot.id,
+            "tracks_count": placement.tracks_count,
+            "total_tracks": placement.total_tracks,
+            "source_marker": placement.source_marker,
+        }
+        for playlist_id, placement in state.items()
+    ]
+
+
+def store_placements(
+    snapshot: Snapshot,
+    rows: Sequence[dict],
+    previous_state: Dict[int, Placement],
+    delta_depth: int,
+    db: Session,
+) -> int:
+    """
+    Insert rows for snapshot as a keyframe (delta_depth 0) or as a delta against previous_state.
+    rows are full placement dicts for every current playlist. Returns the number of rows written.
+    """
+    snapshot.delta_depth = delta_depth
+    if delta_depth == 0:
+        written = list(rows)
+    else:
+        current_ids = {row["playlist_id"] for row in rows}
+        written = [
+            row for row in rows
+            if row["playlist_id"] not in previous_state
+            or _changed(previous_state[row["playlist_id"]], row)
+        ]
+        written += [
+            {
+                "artist_id": snapshot.artist_id,
+                "playlist_id": playlist_id,
+                "snapshot_id": snapshot.id,
+                "tracks_count": 0,
+                "removed": True,
+            }
+            for playlist_id in previous_state
+            if playlist_id not in current_ids
+        ]
+    if written:
+        db.execute(insert(Placement), written)
+    return len(written)
+
+
+def write_placements(
+    snapshot: Snapshot,
+    rows: Sequence[dict],
+    previous: Snapshot | None,
+    previous_state: Dict[int, Placement],
+    db: Session,
+) -> Tuple[int, bool]:
+    """
+    Insert the placements for a new snapshot (flushed, not committed). previous_state is
+    snapshot_state() of previous. Returns (rows written, whether a keyframe was written).
+    """
+    delta_depth = next_delta_depth(previous)
+    return store_placements(snapshot, rows, previous_state, delta_depth, db), delta_depth == 0
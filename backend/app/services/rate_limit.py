@@ -0,0 +1,155 @@
+"""
+Per-provider rate limiting for music API clients.
+One token bucket per provider is shared by every thread in the process; 429 and 5xx
+responses are retried with Retry-After / exponential backoff plus jitter.
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional
+
+import requests
+
+from app.core.config import settings
+
+
+class TokenBucket:
+    """Thread-safe token bucket with a shared cooldown used when the provider throttles us."""
+
+    def __init__(self, name: str, rate: float, burst: int):
+        self.name = name
+        self.rate = max(rate, 0.001)
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._cooldown_until = 0.0
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._waits = 0
+        self._wait_seconds = 0.0
+        self._throttles = 0
+        self._retries = 0
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if now < self._cooldown_until:
+                    delay = self._cooldown_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    self._requests += 1
+                    if waited:
+                        self._waits += 1
+                        self._wait_seconds += waited
+                    return
+                else:
+                    delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def throttle(self, delay: float) -> None:
+        """Pause all callers for delay seconds (provider answered 429)."""
+        with self._lock:
+            self._throttles += 1
+            self._tokens = 0
+            self._cooldown_until = max(self._cooldown_until, time.monotonic() + delay)
+
+    def record_retry(self) -> None:
+        with self._lock:
+            self._retries += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "rate": self.rate,
+                "burst": self.burst,
+                "requests": self._requests,
+                "waits": self._waits,
+                "wait_seconds": round(self._wait_seconds, 3),
+                "throttles": self._throttles,
+                "retries": self._retries,
+            }
+
+
+_limiters: Dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(provider: str) -> TokenBucket:
+    """Return the process-wide limiter for 'spotify' or 'soundcloud'."""
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            if provider == "soundcloud":
+                rate = settings.SOUNDCLOUD_RATE_LIMIT_PER_SECOND
+                burst = settings.SOUNDCLOUD_RATE_LIMIT_BURST
+            else:
+                rate = settings.SPOTIFY_RATE_LIMIT_PER_SECOND
+                burst = settings.SPOTIFY_RATE_LIMIT_BURST
+            limiter = TokenBucket(provider, rate, burst)
+            _limiters[provider] = limiter
+        return limiter
+
+
+def get_rate_limit_stats() -> Dict[str, dict]:
+    """Counters for every limiter created so far, keyed by provider."""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.stats() for limiter in limiters}
+
+
+def _retry_after_seconds(response: requests.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff_seconds(attempt: int) -> float:
+    delay = settings.PROVIDER_BACKOFF_BASE_SECONDS * (2 ** attempt)
+    return min(delay, settings.PROVIDER_BACKOFF_MAX_SECONDS) * random.uniform(0.5, 1.5)
+
+
+def send_with_rate_limit(provider: str, send: Callable[[], requests.Response]) -> requests.Response:
+    """
+    Send a request through the provider's limiter, retrying 429 and 5xx responses.
+    Returns the last response; callers still call raise_for_status().
+    """
+    limiter = get_limiter(provider)
+    max_retries = max(settings.PROVIDER_MAX_RETRIES, 0)
+    for attempt in range(max_retries + 1):
+        limiter.acquire()
+        response = send()
+        status = response.status_code
+        if status != 429 and status < 500:
+            return response
+        if attempt == max_retries:
+            return response
+
+        limiter.record_retry()
+        delay = _retry_after_seconds(response)
+        if delay is None:
+            delay = _backoff_seconds(attempt)
+        else:
+            delay += random.uniform(0, 0.25)
+        if status == 429:
+            print(f"[{provider}] Throttled (429), pausing requests for {delay:.2f}s")
+            limiter.throttle(delay)
+        else:
+            print(f"[{provider}] Server error {status}, retrying in {delay:.2f}s")
+            time.sleep(delay)
+    return response
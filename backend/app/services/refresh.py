@@ -0,0 +1,209 @@
+"""
+Artist refresh: run discovery and persist the result as a snapshot.
+Shared by the artists routes, background refresh jobs and the scheduler.
+"""
+
+import enum
+from datetime import datetime, timezone
+
+from app.db.session import SessionLocal
+from app.models.artist import Artist
+from app.models.placement import Placement
+from app.models.playlist import Playlist
+from app.models.snapshot import Snapshot
+from app.schemas.artist import ArtistQueryResponse, PlaylistSummary
+from app.services.diffing import record_changes
+from app.services.discovery import discover_playlists, upsert_playlists, verify_playlists
+from app.services.jobs import Job, artist_refresh_guard, submit_job
+from app.services.placement_store import snapshot_state, write_placements
+from app.services.spotify_client import artist_lookup_scope, get_artist as get_spotify_artist
+
+
+class RefreshMode(str, enum.Enum):
+    FULL = "full"  # search-based discovery plus verification
+    VERIFY_ONLY = "verify_only"  # re-check the previous snapshot's playlists, no searches
+
+
+# Snapshot.discovery_method_used for each mode
+DISCOVERY_METHODS = {RefreshMode.FULL: "hybrid", RefreshMode.VERIFY_ONLY: "verify_only"}
+
+
+def playlist_type_str(playlist):
+    return playlist.playlist_type.value if playlist.playlist_type else "user_generated"
+
+
+def playlist_summary(playlist, placement=None):
+    """PlaylistSummary for a playlist; without a placement it is reported with no tracks (e.g. lost)."""
+    return PlaylistSummary(
+        id=playlist.id,
+        name=playlist.name,
+        playlist_type=playlist_type_str(playlist),
+        tracks_count=placement.tracks_count if placement is not None else 0,
+        total_tracks=getattr(placement, "total_tracks", None),
+    )
+
+
+def _playlists_by_id(playlist_ids, db):
+    """Load playlists for ids with a single IN query."""
+    if not playlist_ids:
+        return {}
+    return {
+        pl.id: pl
+        for pl in db.query(Playlist).filter(Playlist.id.in_(set(playlist_ids))).all()
+    }
+
+
+def placements_to_summaries(placements, db):
+    """Summaries for placements, in order, loading all their playlists at once."""
+    playlists = _playlists_by_id([p.playlist_id for p in placements], db)
+    return [
+        playlist_summary(playlists[p.playlist_id], p)
+        for p in placements
+        if p.playlist_id in playlists
+    ]
+
+
+def run_discovery_and_respond(
+    artist, db, update_name_from_spotify=True, on_progress=None, mode=RefreshMode.FULL
+):
+    """
+    Run playlist discovery for artist, store a new snapshot with its placements,
+    and return the snapshot with gained/lost playlists versus the previous one.
+    In VERIFY_ONLY mode only the previous snapshot's playlists are re-checked (no searches), so
+    new playlists are not found and playlists that can no longer be fetched or no longer contain
+    any of the artist's tracks are reported lost;
+    an artist without a snapshot always gets full discovery.
+    Refreshes of the same artist never overlap, whichever path starts them.
+    """
+    with artist_refresh_guard(artist.id):
+        return _discover_and_store(artist, db, update_name_from_spotify, on_progress, mode)
+
+
+def _discover_and_store(artist, db, update_name_from_spotify, on_progress, mode):
+    spotify_id = artist.spotify_artist_id
+    if update_name_from_spotify:
+        try:
+            data = get_spotify_artist(spotify_id)
+            artist.name = data["name"]
+            if data.get("image_url"):
+                artist.image_url = data["image_url"]
+        except Exception:
+            pass
+
+    previous = (
+        db.query(Snapshot)
+        .filter(Snapshot.artist_id == artist.id)
+        .order_by(Snapshot.snapshot_time.desc(), Snapshot.id.desc())
+        .first()
+    )
+    previous_state = snapshot_state(previous.id, db) if previous else {}
+    # Counts and version markers from the previous snapshot let discovery skip unchanged playlists
+    previous_playlists = _playlists_by_id(previous_state, db)
+    known = {
+        previous_playlists[playlist_id].spotify_playlist_id: {
+            "tracks_count": placement.tracks_count,
+            "total_tracks": placement.total_tracks,
+            "source_marker": placement.source_marker,
+        }
+        for playlist_id, placement in previous_state.items()
+        if playlist_id in previous_playlists
+    }
+    if previous is None:
+        mode = RefreshMode.FULL
+    if mode == RefreshMode.VERIFY_ONLY:
+        checked = list(known)
+        discovered = verify_playlists(spotify_id, checked, on_progress=on_progress)
+    else:
+        discovered = discover_playlists(spotify_id, db, on_progress=on_progress, previous=known)
+        checked = discovered
+
+    snapshot = Snapshot(
+        artist_id=artist.id,
+        total_playlists_found=len(discovered),
+        playlists_checked_count=len(checked),
+        discovery_method_used=DISCOVERY_METHODS[mode],
+    )
+    db.add(snapshot)
+    db.flush()
+    
+    # Update artist timestamps - explicitly set to ensure they're updated
+    now = datetime.now(timezone.utc)
+    artist.last_snapshot_at = snapshot.snapshot_time
+    artist.updated_at = now  # Explicitly set updated_at
+
+    # One upsert for all playlists and one multi-row insert for placements
+    # (only the changes since the previous snapshot in delta storage mode)
+    playlist_ids = upsert_playlists(discovered, db)
+    placement_rows = [
+        {
+            "artist_id": artist.id,
+            "playlist_id": playlist_ids[pl["spotify_playlist_id"]],
+            "snapshot_id": snapshot.id,
+            "tracks_count": pl.get("tracks_count", 1),
+            "total_tracks": pl.get("total_tracks"),
+            "source_marker": pl.get("source_marker"),
+        }
+        for pl in discovered
+    ]
+    written, keyframe = write_placements(snapshot, placement_rows, previous, previous_state, db)
+    if not keyframe:
+        print(f"[refresh] Stored {written} changed placement(s) of {len(placement_rows)} for artist {artist.id}")
+    current_playlist_ids = {row["playlist_id"] for row in placement_rows}
+
+    # Persist gained/lost with the snapshot so readers never have to re-diff placements
+    gained_ids, lost_ids = record_changes(
+        snapshot,
+        previous.id if previous else None,
+        set(previous_state),
+        current_playlist_ids,
+    )
+
+    db.commit()
+    db.refresh(artist)
+    db.refresh(snapshot)
+
+    # Constant number of queries regardless of playlist count: the current placements are
+    # the rows just written, and one IN query loads current and lost playlists together.
+    playlists = _playlists_by_id(current_playlist_ids | set(lost_ids), db)
+    current_playlists = [
+        playlist_summary(playlists[row["playlist_id"]], Placement(**row))
+        for row in placement_rows
+        if row["playlist_id"] in playlists
+    ]
+    current_by_id = {summary.id: summary for summary in current_playlists}
+
+    gained = [current_by_id[pid] for pid in gained_ids if pid in current_by_id]
+    lost = [playlist_summary(playlists[pid]) for pid in lost_ids if pid in playlists]
+
+    return ArtistQueryResponse(
+        artist=artist,
+        snapshot={
+            "id": snapshot.id,
+            "snapshot_time": snapshot.snapshot_time,
+            "total_playlists_found": snapshot.total_playlists_found,
+        },
+        changes={"gained": gained, "lost": lost},
+        current_playlists=current_playlists,
+    )
+
+
+def submit_refresh_job(
+    artist_id: int, user_id: int | None, mode: RefreshMode = RefreshMode.FULL
+) -> Job:
+    """Queue discovery for an artist on the job executor; the job result is the ArtistQueryResponse."""
+
+    def _refresh(job: Job) -> ArtistQueryResponse:
+        # Jobs outlive the request, so they use their own session
+        db = SessionLocal()
+        try:
+            artist = db.query(Artist).filter(Artist.id == artist_id).first()
+            if not artist:
+                raise LookupError(f"Artist {artist_id} no longer exists")
+            with artist_lookup_scope():
+                return run_discovery_and_respond(
+                    artist, db, update_name_from_spotify=True, on_progress=job.set_progress, mode=mode
+                )
+        finally:
+            db.close()
+
+    return submit_job("refresh", _refresh, user_id=user_id, artist_id=artist_id)
@@ -0,0 +1,248 @@
+"""
+Snapshot retention: downsample old snapshots per artist.
+
+Every snapshot younger than RETENTION_KEEP_ALL_DAYS is kept; up to RETENTION_KEEP_DAILY_DAYS only
+the last snapshot of each day is kept, and beyond that the last snapshot of each ISO week.
+Deletions run in small transactions of consecutive snapshots. The snapshot following each
+deleted batch is re-pointed at the last kept snapshot before it, with its gained/lost summary
+recomputed across the gap and, in delta storage, its placements re-encoded against that snapshot.
+"""
+
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, func, text, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.placement import Placement
+from app.models.snapshot import Snapshot
+from app.services.diffing import record_changes
+from app.services.placement_store import next_delta_depth, snapshot_state, state_to_rows, store_placements
+
+_thread: Optional[threading.Thread] = None
+_stop = threading.Event()
+
+
+@dataclass
+class _Entry:
+    id: int
+    snapshot_time: datetime
+    delta_depth: Optional[int]
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite returns naive UTC timestamps
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _bucket(snapshot_time: datetime, now: datetime):
+    """Retention bucket of a snapshot; None if it is within the keep-everything window."""
+    age = now - snapshot_time
+    if age < timedelta(days=settings.RETENTION_KEEP_ALL_DAYS):
+        return None
+    if age < timedelta(days=settings.RETENTION_KEEP_DAILY_DAYS):
+        return ("day", snapshot_time.date())
+    year, week, _ = snapshot_time.isocalendar()
+    return ("week", year, week)
+
+
+def plan_deletions(entries: List[_Entry], now: datetime) -> set[int]:
+    """Ids to delete from one artist's snapshots (oldest first): all but the last in each bucket."""
+    last_in_bucket: Dict[tuple, int] = {}
+    for entry in entries:
+        bucket = _bucket(_as_utc(entry.snapshot_time), now)
+        if bucket is not None:
+            last_in_bucket[bucket] = entry.id
+    kept = set(last_in_bucket.values())
+    return {
+        entry.id for entry in entries
+        if entry.id not in kept and _bucket(_as_utc(entry.snapshot_time), now) is not None
+    }
+
+
+def _delete_batch(
+    artist_id: int,
+    previous: Optional[_Entry],
+    batch: List[_Entry],
+    successor: _Entry,
+    descendants: List[_Entry],
+    db: Session,
+) -> Dict[str, int]:
+    """
+    Delete batch (consecutive snapshots) and splice successor onto previous in one transaction.
+    descendants are the delta snapshots after successor up to the next keyframe.
+    """
+    # Rebuild both states before any rows go away: successor may be a delta on top of the batch
+    previous_state = snapshot_state(previous.id, db) if previous else {}
+    successor_state = snapshot_state(successor.id, db)
+    batch_ids = [entry.id for entry in batch]
+
+    snapshot = db.get(Snapshot, successor.id)
+    record_changes(
+        snapshot,
+        previous.id if previous else None,
+        set(previous_state),
+        set(successor_state),
+    )
+    rewritten = 0
+    if successor.delta_depth:
+        # Its delta rows may refer to deleted ancestors: re-encode against the new predecessor
+        db.execute(delete(Placement).where(Placement.snapshot_id == successor.id))
+        depth = next_delta_depth(previous)
+        rewritten = store_placements(
+            snapshot, state_to_rows(snapshot, successor_state), previous_state, depth, db
+        )
+        successor.delta_depth = depth
+        # Keep depths increasing along the chain so replay order stays keyframe-first
+        for offset, entry in enumerate(descendants, start=1):
+            entry.delta_depth = depth + offset
+            db.execute(
+                update(Snapshot).where(Snapshot.id == entry.id).values(delta_depth=entry.delta_depth)
+            )
+
+    placements_deleted = db.execute(
+        delete(Placement).where(Placement.snapshot_id.in_(batch_ids))
+    ).rowcount
+    # Nothing else may keep pointing at a deleted snapshot
+    db.execute(
+        update(Snapshot)
+        .where(Snapshot.previous_snapshot_id.in_(batch_ids))
+        .where(Snapshot.id != successor.id)
+        .values(previous_snapshot_id=previous.id if previous else None)
+    )
+    snapshots_deleted = db.execute(
+        delete(Snapshot).where(Snapshot.id.in_(batch_ids)).where(Snapshot.artist_id == artist_id)
+    ).rowcount
+    db.commit()
+    return {
+        "snapshots_deleted": snapshots_deleted,
+        "placements_deleted": placements_deleted,
+        "placements_rewritten": rewritten,
+    }
+
+
+def compact_artist(artist_id: int, db: Session, now: datetime | None = None) -> Dict[str, int]:
+    """Apply the retention policy to one artist's snapshots."""
+    now = now or datetime.now(timezone.utc)
+    entries = [
+        _Entry(id=row.id, snapshot_time=row.snapshot_time, delta_depth=row.delta_depth)
+        for row in db.query(Snapshot.id, Snapshot.snapshot_time, Snapshot.delta_depth)
+        .filter(Snapshot.artist_id == artist_id)
+        .order_by(Snapshot.snapshot_time, Snapshot.id)
+        .all()
+    ]
+    totals = {"snapshots_deleted": 0, "placements_deleted": 0, "placements_rewritten": 0}
+    doomed = plan_deletions(entries, now)
+    batch_size = max(settings.RETENTION_BATCH_SIZE, 1)
+
+    previous: Optional[_Entry] = None
+    batch: List[_Entry] = []
+    for index, entry in enumerate(entries):
+        if entry.id in doomed:
+            batch.append(entry)
+            # The newest snapshot of each bucket is always kept, so a successor always exists
+            successor = entries[index + 1]
+            if len(batch) < batch_size and successor.id in doomed:
+                continue
+            descendants = []
+            for later in entries[index + 2:]:
+                if not later.delta_depth:
+                    break
+                descendants.append(later)
+            result = _delete_batch(artist_id, previous, batch, successor, descendants, db)
+            for key, value in result.items():
+                totals[key] += value
+            batch = []
+        else:
+            previous = entry
+    return totals
+
+
+def _free_bytes(db: Session) -> Optional[int]:
+    """Bytes in SQLite's freelist (pages freed by deletes, reusable without growing the file)."""
+    if db.get_bind().dialect.name != "sqlite":
+        return None
+    page_size = db.execute(text("PRAGMA page_size")).scalar()
+    return db.execute(text("PRAGMA freelist_count")).scalar() * page_size
+
+
+def run_once(now: datetime | None = None) -> Dict[str, int | None]:
+    """Compact every artist with snapshots past the keep-everything window; returns totals."""
+    now = now or datetime.now(timezone.utc)
+    cutoff = now - timedelta(days=settings.RETENTION_KEEP_ALL_DAYS)
+    db = SessionLocal()
+    try:
+        free_before = _free_bytes(db)
+        artist_ids = [
+            row[0]
+            for row in db.query(Snapshot.artist_id)
+            .filter(Snapshot.snapshot_time < cutoff)
+            .group_by(Snapshot.artist_id)
+            .having(func.count(Snapshot.id) > 1)
+            .all()
+        ]
+        db.rollback()
+        report: Dict[str, int | None] = {
+            "artists": len(artist_ids),
+            "snapshots_deleted": 0,
+            "placements_deleted": 0,
+            "placements_rewritten": 0,
+        }
+        for artist_id in artist_ids:
+            if _stop.is_set():
+                break  # Shutting down; the rest is picked up next run
+            try:
+                result = compact_artist(artist_id, db, now)
+            except Exception as e:
+                db.rollback()
+                print(f"[retention] Compaction failed for artist {artist_id}: {e}")
+                continue
+            for key, value in result.items():
+                report[key] += value
+        free_after = _free_bytes(db)
+        report["bytes_reclaimed"] = (
+            max(free_after - free_before, 0) if free_before is not None and free_after is not None else None
+        )
+    finally:
+        db.close()
+    if report["snapshots_deleted"]:
+        print(
+            f"[retention] Deleted {report['snapshots_deleted']} snapshot(s) and "
+            f"{report['placements_deleted']} placement row(s) across {report['artists']} artist(s); "
+            f"{report['bytes_reclaimed'] if report['bytes_reclaimed'] is not None else 'unknown'} bytes reclaimed"
+        )
+    return report
+
+
+def _loop() -> None:
+    while not _stop.is_set():
+        try:
+            run_once()
+        except Exception as e:
+            print(f"[retention] Run failed: {e}")
+        _stop.wait(settings.RETENTION_INTERVAL_SECONDS)
+
+
+def start() -> None:
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return
+    _stop.clear()
+    _thread = threading.Thread(target=_loop, name="snapshot-retention", daemon=True)
+    _thread.start()
+
+
+def stop() -> None:
+    global _thread
+    _stop.set()
+    if _thread is not None:
+        _thread.join(timeout=5)
+        _thread = None
+
+
+if __name__ == "__main__":
+    print(run_once())
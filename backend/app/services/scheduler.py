@@ -0,0 +1,160 @@
+"""
+Background refresh scheduler.
+Refreshes each artist on a cadence set by Artist.refresh_tier, measured from last_snapshot_at.
+Most scheduled refreshes only re-verify known playlists; full discovery (searches included)
+runs once REFRESH_FULL_DISCOVERY_INTERVAL_HOURS have passed since the artist's last one.
+Runs one thread per process; with several web workers, enable it on one of them only.
+"""
+
+import hashlib
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, or_
+
+from app.core.config import settings
+from app.core.provider import get_effective_provider
+from app.db.session import SessionLocal
+from app.models.artist import Artist, RefreshTier
+from app.models.snapshot import Snapshot
+from app.services.jobs import Job, is_artist_refresh_active
+from app.services.refresh import DISCOVERY_METHODS, RefreshMode, submit_refresh_job
+
+_thread: Optional[threading.Thread] = None
+_stop = threading.Event()
+# Jobs submitted by the scheduler that may still be running, with the provider they use
+_inflight: List[Tuple[Job, str]] = []
+
+
+def refresh_interval(tier: RefreshTier | None) -> timedelta:
+    if tier == RefreshTier.TIER1:
+        hours = settings.REFRESH_INTERVAL_TIER1_HOURS
+    elif tier == RefreshTier.TIER2:
+        hours = settings.REFRESH_INTERVAL_TIER2_HOURS
+    else:
+        hours = settings.REFRESH_INTERVAL_DEFAULT_HOURS
+    return timedelta(hours=hours)
+
+
+def _jitter_factor(artist_id: int, last_snapshot_at: datetime) -> float:
+    """Stable per-artist, per-snapshot offset in [-SCHEDULER_JITTER_FRACTION, +SCHEDULER_JITTER_FRACTION]."""
+    digest = hashlib.sha1(f"{artist_id}:{last_snapshot_at.isoformat()}".encode()).digest()
+    unit = int.from_bytes(digest[:4], "big") / 0xFFFFFFFF
+    return (unit * 2 - 1) * settings.SCHEDULER_JITTER_FRACTION
+
+
+def next_refresh_at(artist_id: int, tier: RefreshTier | None, last_snapshot_at: datetime | None) -> datetime:
+    """When the artist is next due; artists that were never refreshed are due immediately."""
+    if last_snapshot_at is None:
+        return datetime.min.replace(tzinfo=timezone.utc)
+    if last_snapshot_at.tzinfo is None:
+        # SQLite returns naive UTC timestamps
+        last_snapshot_at = last_snapshot_at.replace(tzinfo=timezone.utc)
+    interval = refresh_interval(tier)
+    return last_snapshot_at + interval * (1 + _jitter_factor(artist_id, last_snapshot_at))
+
+
+def _due_artists(now: datetime) -> List[Tuple[int, int | None]]:
+    """(artist_id, user_id) for every due artist, most overdue first."""
+    db = SessionLocal()
+    try:
+        rows = db.query(
+            Artist.id, Artist.user_id, Artist.refresh_tier, Artist.last_snapshot_at
+        ).all()
+    finally:
+        db.close()
+    due = []
+    for artist_id, user_id, tier, last_snapshot_at in rows:
+        due_at = next_refresh_at(artist_id, tier, last_snapshot_at)
+        if due_at <= now:
+            due.append((due_at, artist_id, user_id))
+    due.sort(key=lambda d: (d[0], d[1]))
+    return [(artist_id, user_id) for _, artist_id, user_id in due]
+
+
+def refresh_mode(artist_id: int, now: datetime) -> RefreshMode:
+    """FULL if the artist has had no full discovery within REFRESH_FULL_DISCOVERY_INTERVAL_HOURS."""
+    interval = timedelta(hours=settings.REFRESH_FULL_DISCOVERY_INTERVAL_HOURS)
+    if interval <= timedelta(0):
+        return RefreshMode.FULL
+    verify_only = DISCOVERY_METHODS[RefreshMode.VERIFY_ONLY]
+    db = SessionLocal()
+    try:
+        last_full = (
+            db.query(func.max(Snapshot.snapshot_time))
+            .filter(Snapshot.artist_id == artist_id)
+            .filter(or_(
+                Snapshot.discovery_method_used.is_(None),
+                Snapshot.discovery_method_used != verify_only,
+            ))
+            .scalar()
+        )
+    finally:
+        db.close()
+    if last_full is None:
+        return RefreshMode.FULL
+    if last_full.tzinfo is None:
+        last_full = last_full.replace(tzinfo=timezone.utc)
+    return RefreshMode.FULL if now - last_full >= interval else RefreshMode.VERIFY_ONLY
+
+
+def run_once(now: datetime | None = None) -> int:
+    """Queue refreshes for due artists within the concurrency caps. Returns how many were queued."""
+    now = now or datetime.now(timezone.utc)
+    _inflight[:] = [(job, provider) for job, provider in _inflight if job.is_active]
+
+    provider = get_effective_provider()
+    global_slots = settings.SCHEDULER_MAX_CONCURRENT - len(_inflight)
+    provider_slots = settings.SCHEDULER_MAX_CONCURRENT_PER_PROVIDER - sum(
+        1 for _, p in _inflight if p == provider
+    )
+    slots = min(global_slots, provider_slots)
+    if slots <= 0:
+        return 0
+
+    queued = 0
+    full = 0
+    for artist_id, user_id in _due_artists(now):
+        if queued >= slots:
+            break
+        if is_artist_refresh_active(artist_id):
+            continue  # Manual or earlier scheduled refresh still running
+        mode = refresh_mode(artist_id, now)
+        try:
+            job = submit_refresh_job(artist_id, user_id, mode)
+        except Exception as e:
+            print(f"[scheduler] Could not queue refresh for artist {artist_id}: {e}")
+            break
+        _inflight.append((job, provider))
+        queued += 1
+        full += mode == RefreshMode.FULL
+    if queued:
+        print(f"[scheduler] Queued {queued} artist refresh(es) on {provider} ({full} with full discovery)")
+    return queued
+
+
+def _loop() -> None:
+    while not _stop.is_set():
+        try:
+            run_once()
+        except Exception as e:
+            print(f"[scheduler] Tick failed: {e}")
+        _stop.wait(settings.SCHEDULER_POLL_SECONDS)
+
+
+def start() -> None:
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return
+    _stop.clear()
+    _thread = threading.Thread(target=_loop, name="refresh-scheduler", daemon=True)
+    _thread.start()
+
+
+def stop() -> None:
+    global _thread
+    _stop.set()
+    if _thread is not None:
+        _thread.join(timeout=5)
+        _thread = None
@@ -5,29 +5,40 @@ Implements the same interface as spotify_client for seamless integration.
 
 import base64
 import requests
-import time
-from typing import List, Optional, Dict
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
 from app.core.config import settings
+from app.services.cache import TTLCache
+from app.services.http_cache import get_json, response_cache
+from app.services.http_session import ClientSession, request_timeout, split_page_url
+from app.services.rate_limit import get_rate_limit_stats, send_with_rate_limit
+from app.services.token_manager import TokenManager
 
 BASE_URL = "https://api.soundcloud.com"
 TOKEN_URL = "https://secure.soundcloud.com/oauth/token"
 
-# Token state (in-memory, per process)
-_access_token: Optional[str] = None
+# Refresh token state (in-memory, per process); only touched inside _tokens fetches, which never overlap
 _refresh_token: Optional[str] = None
-_token_expires_at: float = 0
 
+_http = ClientSession()
 
-def _get_access_token() -> str:
+# Tracks per page when listing playlist tracks
+_TRACK_PAGE_SIZE = 200
+
+# URL -> resolved resource; profile URLs map to stable ids, so this can live much longer than API payloads
+_resolve_cache = TTLCache(
+    "soundcloud_resolve",
+    maxsize=settings.ARTIST_CACHE_MAX_ENTRIES,
+    ttl=settings.URL_RESOLVE_CACHE_TTL_SECONDS,
+)
+
+
+def _fetch_access_token() -> Tuple[str, float]:
     """
-    Get a valid SoundCloud access token.
-    Reuses existing token if still valid, refreshes if needed, or gets new one.
+    Get a new SoundCloud access token.
+    Uses the refresh token if we have one, otherwise Client Credentials.
     """
-    global _access_token, _refresh_token, _token_expires_at
-    
-    # Check if we have a valid token (with 5 minute buffer)
-    if _access_token and time.time() < (_token_expires_at - 300):
-        return _access_token
+    global _refresh_token
     
     # Try to refresh if we have a refresh token
     if _refresh_token:
@@ -44,7 +55,7 @@ def _get_access_token() -> str:
     auth_str = f"{settings.SOUNDCLOUD_CLIENT_ID}:{settings.SOUNDCLOUD_CLIENT_SECRET}"
     b64 = base64.b64encode(auth_str.encode()).decode()
     
-    response = requests.post(
+    response = _http.get().post(
         TOKEN_URL,
         headers={
             "Authorization": f"Basic {b64}",
@@ -52,21 +63,18 @@ def _get_access_token() -> str:
             "accept": "application/json; charset=utf-8",
         },
         data={"grant_type": "client_credentials"},
-        timeout=10,
+        timeout=request_timeout(),
     )
     response.raise_for_status()
     
     data = response.json()
-    _access_token = data["access_token"]
     _refresh_token = data.get("refresh_token")
-    _token_expires_at = time.time() + data.get("expires_in", 3600) - 60
-    
-    return _access_token
+    return data["access_token"], data.get("expires_in", 3600)
 
 
-def _refresh_access_token() -> str:
+def _refresh_access_token() -> Tuple[str, float]:
     """Refresh the access token using refresh_token."""
-    global _access_token, _refresh_token, _token_expires_at
+    global _refresh_token
     
     if not _refresh_token:
         raise ValueError("No refresh token available")
@@ -74,7 +82,10 @@ def _refresh_access_token() -> str:
     if not settings.SOUNDCLOUD_CLIENT_ID or not settings.SOUNDCLOUD_CLIENT_SECRET:
         raise ValueError("SoundCloud credentials not configured")
     
-    response = requests.post(
+    refresh_token = _refresh_token
+    # The refresh token is one-time use; never send it twice even if this request fails
+    _refresh_token = None
+    response = _http.get().post(
         TOKEN_URL,
         headers={
             "Content-Type": "application/x-www-form-urlencoded",
@@ -84,18 +95,23 @@ def _refresh_access_token() -> str:
             "grant_type": "refresh_token",
             "client_id": settings.SOUNDCLOUD_CLIENT_ID,
             "client_secret": settings.SOUNDCLOUD_CLIENT_SECRET,
-            "refresh_token": _refresh_token,
+            "refresh_token": refresh_token,
         },
-        timeout=10,
+        timeout=request_timeout(),
     )
     response.raise_for_status()
     
     data = response.json()
-    _access_token = data["access_token"]
     _refresh_token = data.get("refresh_token")  # New refresh token (one-time use)
-    _token_expires_at = time.time() + data.get("expires_in", 3600) - 60
-    
-    return _access_token
+    return data["access_token"], data.get("expires_in", 3600)
+
+
+_tokens = TokenManager("soundcloud", _fetch_access_token)
+
+
+def _get_access_token() -> str:
+    """Get a valid SoundCloud access token (shared by all threads, refreshed single-flight)."""
+    return _tokens.get_token()
 
 
 def _make_request(endpoint: str, params: dict = None, return_list: bool = False):
@@ -111,30 +127,39 @@ def _make_request(endpoint: str, params: dict = None, return_list: bool = False)
         "accept": "application/json; charset=utf-8",
     }
     
+    def _get() -> dict | list:
+        # Conditional GET: unchanged resources come back as 304 and are served from the response cache
+        return get_json(
+            "soundcloud",
+            url,
+            params,
+            lambda conditional_headers: send_with_rate_limit(
+                "soundcloud",
+                lambda: _http.get().get(
+                    url,
+                    headers={**headers, **conditional_headers},
+                    params=params,
+                    timeout=request_timeout(),
+                ),
+            ),
+        )
+
     try:
-        response = requests.get(url, headers=headers, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        # SoundCloud sometimes returns lists directly, sometimes wrapped
-        if return_list and isinstance(data, dict):
-            # Check if it's a paginated response with collection
-            return data.get("collection", data.get("data", []))
-        return data
+        data = _get()
     except requests.exceptions.HTTPError as e:
         # If 401, try refreshing token once
-        if e.response.status_code == 401:
-            # Force refresh
-            global _access_token
-            _access_token = None
-            token = _get_access_token()
-            headers["Authorization"] = f"OAuth {token}"
-            response = requests.get(url, headers=headers, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            if return_list and isinstance(data, dict):
-                return data.get("collection", data.get("data", []))
-            return data
-        raise
+        if e.response.status_code != 401:
+            raise
+        # Force refresh; concurrent 401s for the same token share one refresh
+        _tokens.invalidate(token)
+        token = _get_access_token()
+        headers["Authorization"] = f"OAuth {token}"
+        data = _get()
+    # SoundCloud sometimes returns lists directly, sometimes wrapped
+    if return_list and isinstance(data, dict):
+        # Check if it's a paginated response with collection
+        return data.get("collection", data.get("data", []))
+    return data
 
 
 # Public API functions matching Spotify client interface
@@ -273,6 +298,7 @@ def search_playlists(query: str, limit: int = 50) -> List[dict]:
                     "total": playlist.get("likes_count", 0) or playlist.get("followers_count", 0),
                 },
                 "description": playlist.get("description"),
+                "snapshot_id": _change_marker(playlist),
             })
         
         print(f"[SoundCloud] Returning {len(result)} normalized playlists")
@@ -284,6 +310,88 @@ def search_playlists(query: str, limit: int = 50) -> List[dict]:
         return []
 
 
+def _change_marker(playlist: dict) -> str | None:
+    """
+    Stand-in for Spotify's playlist snapshot_id: changes whenever the playlist is edited.
+    Built from fields present in both search results and full playlist payloads.
+    """
+    if not playlist.get("last_modified"):
+        return None
+    return f"{playlist['last_modified']}:{playlist.get('track_count')}"
+
+
+def _normalize_playlist(playlist: dict, playlist_id: str) -> dict:
+    """Normalize a SoundCloud playlist payload to Spotify-like playlist format."""
+    owner = playlist.get("user", {})
+    result = {
+        "id": str(playlist.get("id", playlist_id)),
+        "name": playlist.get("title", "Unknown Playlist"),
+        "owner": {
+            "id": str(owner.get("id", "unknown")),
+            "display_name": owner.get("full_name") or owner.get("username", "Unknown"),
+        },
+        "followers": {
+            "total": playlist.get("likes_count", 0) or playlist.get("followers_count", 0),
+        },
+        "description": playlist.get("description"),
+        "snapshot_id": _change_marker(playlist),
+    }
+    if playlist.get("track_count") is not None:
+        result["tracks"] = {"total": playlist["track_count"]}
+    return result
+
+
+def _normalize_track(track: dict) -> dict:
+    """Normalize a SoundCloud track to Spotify-like track format."""
+    track_user = track.get("user") or {}
+    return {
+        "id": str(track.get("id")),
+        "name": track.get("title", "Unknown Track"),
+        "artists": [
+            {
+                "id": str(track_user.get("id", "")),
+                "name": track_user.get("full_name") or track_user.get("username", "Unknown Artist"),
+            }
+        ],
+        "duration": track.get("duration", 0),
+    }
+
+
+def iter_playlist_tracks(playlist_id: str, playlist: dict | None = None) -> Iterator[dict]:
+    """
+    Yield every track of a playlist in normalized form, fetching pages lazily with
+    linked_partitioning and following next_href. playlist is a /playlists/{id} payload already
+    in hand; its embedded tracks are used when complete (large playlists only embed stubs).
+    Stop iterating early to skip the remaining requests.
+    """
+    embedded = (playlist or {}).get("tracks") or []
+    if (
+        embedded
+        and len(embedded) >= (playlist.get("track_count") or 0)
+        and all(isinstance(track, dict) and track.get("user") for track in embedded)
+    ):
+        for track in embedded:
+            yield _normalize_track(track)
+        return
+
+    page = _make_request(
+        f"/playlists/{playlist_id}/tracks",
+        params={"limit": _TRACK_PAGE_SIZE, "linked_partitioning": "true"},
+    )
+    while True:
+        if isinstance(page, list):
+            items, next_href = page, None
+        else:
+            items, next_href = page.get("collection") or [], page.get("next_href")
+        for track in items:
+            if isinstance(track, dict):
+                yield _normalize_track(track)
+        if not next_href or not items:
+            return
+        endpoint, params = split_page_url(next_href, BASE_URL)
+        page = _make_request(endpoint, params=params)
+
+
 def get_playlist(playlist_id: str) -> dict:
     """
     Get playlist details by ID.
@@ -293,22 +401,7 @@ def get_playlist(playlist_id: str) -> dict:
     try:
         # Don't use show_tracks=false - we want tracks for verification
         playlist = _make_request(f"/playlists/{playlist_id}")
-        
-        owner = playlist.get("user", {})
-        
-        # Normalize to Spotify-like format
-        result = {
-            "id": str(playlist.get("id", playlist_id)),
-            "name": playlist.get("title", "Unknown Playlist"),
-            "owner": {
-                "id": str(owner.get("id", "unknown")),
-                "display_name": owner.get("full_name") or owner.get("username", "Unknown"),
-            },
-            "followers": {
-                "total": playlist.get("likes_count", 0) or playlist.get("followers_count", 0),
-            },
-            "description": playlist.get("description"),
-        }
+        result = _normalize_playlist(playlist, playlist_id)
         print(f"[SoundCloud] Retrieved playlist: {result['name']}")
         return result
     except Exception as e:
@@ -324,63 +417,16 @@ def get_playlist_tracks(
     artist_id: str | None = None,
 ) -> List[dict]:
     """
-    Get tracks from a playlist.
+    Get the first limit tracks of a playlist.
     If artist_id is provided, filters tracks by that artist (user).
     Returns normalized format matching Spotify's track response.
     """
     print(f"[SoundCloud] Getting tracks for playlist: {playlist_id}, filtering by artist: {artist_id}")
     try:
-        # Get playlist with tracks - need to request with tracks included
-        playlist = _make_request(f"/playlists/{playlist_id}")
-        tracks_data = playlist.get("tracks", [])
-        
-        print(f"[SoundCloud] Playlist response has {len(tracks_data)} tracks in 'tracks' field")
-        
-        # If tracks not in response, try tracks endpoint
-        if not tracks_data:
-            try:
-                tracks_data = _make_request(f"/playlists/{playlist_id}/tracks", params={"limit": limit}, return_list=True)
-                print(f"[SoundCloud] Tracks endpoint returned type: {type(tracks_data)}")
-                # Handle if it's a list or dict
-                if isinstance(tracks_data, dict):
-                    tracks_data = tracks_data.get("collection", tracks_data.get("data", []))
-            except Exception as e:
-                print(f"[SoundCloud] Error getting tracks from endpoint: {e}")
-                tracks_data = []
-        
-        # Ensure tracks_data is a list
-        if not isinstance(tracks_data, list):
-            print(f"[SoundCloud] tracks_data is not a list, converting...")
-            tracks_data = []
-        
-        print(f"[SoundCloud] Processing {len(tracks_data)} tracks")
-    
-        # Normalize and filter
-        result = []
-        for track in tracks_data[:limit]:
-            if not isinstance(track, dict):
-                continue
-            track_user = track.get("user", {})
-            track_user_id = str(track_user.get("id", ""))
-            
-            # Filter by artist if specified
-            if artist_id and track_user_id != str(artist_id):
-                continue
-            
-            result.append({
-                "id": str(track.get("id")),
-                "name": track.get("title", "Unknown Track"),
-                "artists": [
-                    {
-                        "id": track_user_id,
-                        "name": track_user.get("full_name") or track_user.get("username", "Unknown Artist"),
-                    }
-                ],
-                "duration": track.get("duration", 0),
-            })
-        
-        print(f"[SoundCloud] Returning {len(result)} tracks (filtered by artist_id={artist_id})")
-        return result
+        tracks = islice(iter_playlist_tracks(playlist_id), limit)
+        if artist_id:
+            return [t for t in tracks if t["artists"][0]["id"] == str(artist_id)]
+        return list(tracks)
     except Exception as e:
         print(f"[SoundCloud] Error in get_playlist_tracks: {e}")
         import traceback
@@ -388,17 +434,43 @@ def get_playlist_tracks(
         return []
 
 
+def get_playlist_with_tracks(playlist_id: str) -> Tuple[dict, Iterator[dict]]:
+    """
+    Get playlist details and a lazy iterator over all of its tracks.
+    Small playlists are served entirely by the single /playlists/{id} response.
+    """
+    print(f"[SoundCloud] Getting playlist with tracks: {playlist_id}")
+    playlist = _make_request(f"/playlists/{playlist_id}")
+    return _normalize_playlist(playlist, playlist_id), iter_playlist_tracks(playlist_id, playlist)
+
+
+def get_client_stats() -> dict:
+    """Rate limiter counters and connection reuse for the SoundCloud client."""
+    return {
+        "rate_limit": get_rate_limit_stats().get("soundcloud", {}),
+        "http": _http.stats(),
+        "resolve_cache": _resolve_cache.stats(),
+        "response_cache": response_cache.stats(),
+    }
+
+
 def resolve_soundcloud_url(url: str) -> Optional[dict]:
     """
     Resolve a SoundCloud URL to get resource information.
     Returns dict with 'id' and 'kind' (user, playlist, track) or None if not found.
+    Successful resolutions are cached, so resubmitting the same URL skips the /resolve round trip.
     """
+    key = url.strip().rstrip("/")
     try:
-        result = _make_request("/resolve", params={"url": url})
-        return {
-            "id": str(result.get("id")),
-            "kind": result.get("kind"),  # "user", "playlist", "track"
-            "data": result,  # Full response for reference
-        }
+        return _resolve_cache.get_or_load(key, lambda: _resolve_url(url))
     except Exception:
         return None
+
+
+def _resolve_url(url: str) -> dict:
+    result = _make_request("/resolve", params={"url": url})
+    return {
+        "id": str(result.get("id")),
+        "kind": result.get("kind"),  # "user", "playlist", "track"
+        "data": result,  # Full response for reference
+    }
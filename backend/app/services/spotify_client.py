@@ -1,15 +1,73 @@
 import base64
-import requests
-import time
-from typing import List, Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+from collections import Counter
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from app.core.config import settings
 from app.core.provider import get_effective_provider
+from app.services.cache import TTLCache
+from app.services.http_cache import get_json, response_cache
+from app.services.http_session import ClientSession, request_timeout, split_page_url
+from app.services.rate_limit import get_rate_limit_stats, send_with_rate_limit
+from app.services.token_manager import TokenManager
 
 TOKEN_URL = "https://accounts.spotify.com/api/token"
 BASE_URL = "https://api.spotify.com/v1"
 
-_access_token: Optional[str] = None
-_token_expires_at: float = 0
+_http = ClientSession()
+
+# Spotify's maximum page size for playlist items
+_TRACK_PAGE_SIZE = 100
+
+# fields= projections per call, as {key: nested projection or None}. They must cover every key
+# discovery reads from these responses; tests/test_spotify_projections.py verifies that.
+PLAYLIST_TRACKS_FIELDS = {
+    "items": {"track": {"id": None, "artists": {"id": None, "uri": None}}},
+    "next": None,
+}
+PLAYLIST_FIELDS = {
+    "id": None,
+    "name": None,
+    "snapshot_id": None,
+    "owner": {"id": None, "display_name": None},
+    "followers": {"total": None},
+    "tracks": {"total": None, **PLAYLIST_TRACKS_FIELDS},
+}
+# /search does not accept fields=; this is what discovery may read from its playlist items
+SEARCH_PLAYLIST_FIELDS = {
+    "id": None,
+    "name": None,
+    "snapshot_id": None,
+    "owner": {"id": None, "display_name": None},
+    "followers": {"total": None},
+}
+
+
+def _fields_param(projection: dict) -> str:
+    """Render a projection in Spotify's fields syntax, e.g. owner(id,display_name)."""
+    return ",".join(
+        key if sub is None else f"{key}({_fields_param(sub)})" for key, sub in projection.items()
+    )
+
+
+_TRACK_FIELDS = _fields_param(PLAYLIST_TRACKS_FIELDS)
+_PLAYLIST_FIELDS = _fields_param(PLAYLIST_FIELDS)
+
+# Playlist payloads shared across artists, keyed by (kind, provider, playlist_id, ...)
+playlist_cache = TTLCache(
+    "playlists",
+    maxsize=settings.PLAYLIST_CACHE_MAX_ENTRIES,
+    ttl=settings.PLAYLIST_CACHE_TTL_SECONDS,
+)
+
+# Artist metadata, keyed by (provider, artist_id); see artist_lookup_scope for per-request memoization
+artist_cache = TTLCache(
+    "artists",
+    maxsize=settings.ARTIST_CACHE_MAX_ENTRIES,
+    ttl=settings.ARTIST_CACHE_TTL_SECONDS,
+)
+_artist_scope: ContextVar[Optional[dict]] = ContextVar("artist_lookup_scope", default=None)
 
 
 def _use_mock() -> bool:
@@ -33,45 +91,51 @@ def _use_spotify() -> bool:
     )
 
 
-def _get_access_token() -> str:
-    global _access_token, _token_expires_at
-    
-    if _access_token and time.time() < _token_expires_at:
-        return _access_token
-    
+def _fetch_access_token() -> Tuple[str, float]:
     if not settings.SPOTIFY_CLIENT_ID or not settings.SPOTIFY_CLIENT_SECRET:
         raise ValueError("Spotify credentials not configured")
     
     auth_str = f"{settings.SPOTIFY_CLIENT_ID}:{settings.SPOTIFY_CLIENT_SECRET}"
     b64 = base64.b64encode(auth_str.encode()).decode()
     
-    response = requests.post(
+    response = _http.get().post(
         TOKEN_URL,
         data={"grant_type": "client_credentials"},
         headers={"Authorization": f"Basic {b64}"},
-        timeout=10,
+        timeout=request_timeout(),
     )
     response.raise_for_status()
     
     data = response.json()
-    _access_token = data["access_token"]
-    _token_expires_at = time.time() + data.get("expires_in", 3600) - 60
-    
-    return _access_token
+    return data["access_token"], data.get("expires_in", 3600)
+
+
+_tokens = TokenManager("spotify", _fetch_access_token)
+
+
+def _get_access_token() -> str:
+    return _tokens.get_token()
 
 
 def _make_request(endpoint: str, params: dict = None) -> dict:
     token = _get_access_token()
     url = f"{BASE_URL}{endpoint}"
     
-    response = requests.get(
+    # Conditional GET: unchanged resources come back as 304 and are served from the response cache
+    return get_json(
+        "spotify",
         url,
-        headers={"Authorization": f"Bearer {token}"},
-        params=params,
-        timeout=10,
+        params,
+        lambda conditional_headers: send_with_rate_limit(
+            "spotify",
+            lambda: _http.get().get(
+                url,
+                headers={"Authorization": f"Bearer {token}", **conditional_headers},
+                params=params,
+                timeout=request_timeout(),
+            ),
+        ),
     )
-    response.raise_for_status()
-    return response.json()
 
 
 def _get_artist(spotify_id: str) -> dict:
@@ -84,6 +148,7 @@ def _get_artist_top_tracks(spotify_id: str, market: str = "US") -> List[dict]:
 
 
 def _search_playlists(query: str, limit: int = 50) -> List[dict]:
+    # No fields= here: the search endpoint ignores it (see SEARCH_PLAYLIST_FIELDS)
     data = _make_request(
         "/search",
         params={
@@ -96,27 +161,71 @@ def _search_playlists(query: str, limit: int = 50) -> List[dict]:
 
 
 def _get_playlist(playlist_id: str) -> dict:
-    return _make_request(f"/playlists/{playlist_id}")
-
-
-def _get_playlist_tracks(
-    playlist_id: str,
-    limit: int = 100,
-    artist_id: str | None = None,
-) -> List[dict]:
-    data = _make_request(
-        f"/playlists/{playlist_id}/tracks",
-        params={"limit": limit},
-    )
-    tracks = []
-    for item in data.get("items", []):
-        if item.get("track") and item["track"]:
-            tracks.append(item["track"])
-    return tracks
+    return _make_request(f"/playlists/{playlist_id}", params={"fields": _PLAYLIST_FIELDS})
+
+
+def _iter_playlist_tracks(playlist_id: str, first_page: dict | None = None) -> Iterator[dict]:
+    """
+    Yield every track of a playlist, fetching one page at a time by following `next` links.
+    first_page is an items page already in hand (e.g. embedded in the playlist object).
+    Stop iterating early to skip the remaining requests.
+    """
+    page = first_page
+    if page is None:
+        page = _make_request(
+            f"/playlists/{playlist_id}/tracks",
+            params={"limit": _TRACK_PAGE_SIZE, "fields": _TRACK_FIELDS},
+        )
+    while True:
+        for item in page.get("items") or []:
+            if item and item.get("track"):
+                yield item["track"]
+        if not page.get("next"):
+            return
+        endpoint, params = split_page_url(page["next"], BASE_URL)
+        params.setdefault("fields", _TRACK_FIELDS)
+        page = _make_request(endpoint, params=params)
+
+
+def _get_playlist_tracks(playlist_id: str, limit: int = 100) -> List[dict]:
+    return list(islice(_iter_playlist_tracks(playlist_id), limit))
+
+
+def _get_playlist_with_tracks(playlist_id: str) -> Tuple[dict, Iterator[dict]]:
+    # The playlist object already embeds the first page of items; continue from it instead of refetching.
+    data = _get_playlist(playlist_id)
+    return data, _iter_playlist_tracks(playlist_id, data.get("tracks") or {"items": []})
+
+
+@contextmanager
+def artist_lookup_scope():
+    """
+    Memoize get_artist for the duration of one query/refresh, on top of the short-TTL artist_cache.
+    Nested scopes reuse the outermost one.
+    """
+    if _artist_scope.get() is not None:
+        yield
+        return
+    token = _artist_scope.set({})
+    try:
+        yield
+    finally:
+        _artist_scope.reset(token)
 
 
 def get_artist(spotify_id: str) -> dict:
-    """Get artist information. Works with Spotify IDs, SoundCloud user IDs, or mock."""
+    """Get artist information (memoized per request and briefly per process). Works with Spotify IDs, SoundCloud user IDs, or mock."""
+    key = (get_effective_provider(), str(spotify_id))
+    scope = _artist_scope.get()
+    if scope is not None and key in scope:
+        return scope[key]
+    data = artist_cache.get_or_load(key, lambda: _fetch_artist(spotify_id))
+    if scope is not None:
+        scope[key] = data
+    return data
+
+
+def _fetch_artist(spotify_id: str) -> dict:
     if _use_mock():
         from app.services.spotify_mock import get_artist as mock_get_artist
         return mock_get_artist(spotify_id)
@@ -170,15 +279,35 @@ def search_playlists(query: str, limit: int = 50) -> List[dict]:
     return _search_playlists(query, limit)
 
 
+def _tracks_by_artist(tracks: List[dict], artist_id: str | None) -> List[dict]:
+    """Keep only tracks by artist_id (cached SoundCloud tracks are stored unfiltered)."""
+    if not artist_id:
+        return tracks
+    artist_id = str(artist_id)
+    return [
+        t for t in tracks
+        if any(str(a.get("id", "")) == artist_id for a in t.get("artists", []))
+    ]
+
+
 def get_playlist(playlist_id: str) -> dict:
-    """Get playlist details. Works with Spotify IDs, SoundCloud IDs, or mock."""
+    """
+    Get playlist details. Works with Spotify IDs, SoundCloud IDs, or mock.
+    Compatibility entry point: discovery no longer calls it (see get_playlist_artist_counts).
+    """
     if _use_mock():
         from app.services.spotify_mock import get_playlist as mock_get_playlist
         return mock_get_playlist(playlist_id)
     elif _use_soundcloud():
         from app.services.soundcloud_client import get_playlist as sc_get_playlist
-        return sc_get_playlist(playlist_id)
-    return _get_playlist(playlist_id)
+        return playlist_cache.get_or_load(
+            ("playlist", "soundcloud", playlist_id),
+            lambda: sc_get_playlist(playlist_id),
+        )
+    return playlist_cache.get_or_load(
+        ("playlist", "spotify", playlist_id),
+        lambda: _get_playlist(playlist_id),
+    )
 
 
 def get_playlist_tracks(
@@ -186,11 +315,90 @@ def get_playlist_tracks(
     limit: int = 100,
     artist_id: str | None = None,
 ) -> List[dict]:
-    """Get tracks from a playlist. Works with Spotify, SoundCloud, or mock."""
+    """
+    Get the first limit tracks of a playlist. Works with Spotify, SoundCloud, or mock.
+    Compatibility entry point: discovery no longer calls it (see get_playlist_artist_counts).
+    """
     if _use_mock():
         from app.services.spotify_mock import get_playlist_tracks as mock_tracks
         return mock_tracks(playlist_id, limit, artist_id)
     elif _use_soundcloud():
         from app.services.soundcloud_client import get_playlist_tracks as sc_tracks
-        return sc_tracks(playlist_id, limit, artist_id)
-    return _get_playlist_tracks(playlist_id, limit, artist_id)
+        tracks = playlist_cache.get_or_load(
+            ("tracks", "soundcloud", playlist_id, limit),
+            lambda: sc_tracks(playlist_id, limit),
+        )
+        return _tracks_by_artist(tracks, artist_id)
+    return playlist_cache.get_or_load(
+        ("tracks", "spotify", playlist_id, limit),
+        lambda: _get_playlist_tracks(playlist_id, limit),
+    )
+
+
+def track_artist_id(track_artist: dict) -> str | None:
+    """Extract artist id from track artist (id or uri like spotify:artist:xxx)."""
+    if not track_artist:
+        return None
+    aid = track_artist.get("id")
+    if aid:
+        return str(aid)
+    uri = track_artist.get("uri", "")
+    if isinstance(uri, str) and "artist:" in uri:
+        return uri.split("artist:")[-1].strip()
+    return None
+
+
+def _count_track_artists(tracks: Iterable[dict], max_tracks: int) -> Tuple[Dict[str, int], int]:
+    """({artist id: tracks featuring them}, tracks read), reading at most max_tracks (0 = all)."""
+    counts: Counter = Counter()
+    scanned = 0
+    for track in islice(tracks, max_tracks or None):
+        scanned += 1
+        if not track:
+            continue
+        counts.update({aid for aid in map(track_artist_id, track.get("artists") or []) if aid})
+    return dict(counts), scanned
+
+
+def get_playlist_artist_counts(
+    playlist_id: str,
+    artist_id: str | None = None,
+) -> Tuple[dict, Dict[str, int], int]:
+    """
+    Get playlist details, {artist id: number of tracks featuring them} and the number of tracks read.
+    Tracks are streamed page by page up to DISCOVERY_MAX_TRACKS_PER_PLAYLIST and only the counts are
+    kept, so memory does not grow with playlist length. Works with Spotify, SoundCloud, or mock;
+    results are cached per playlist (not per artist), so artists sharing a playlist fetch it once.
+    artist_id is only used by the mock provider, whose tracks depend on the artist asking.
+    """
+    max_tracks = settings.DISCOVERY_MAX_TRACKS_PER_PLAYLIST
+    if _use_mock():
+        from app.services.spotify_mock import get_playlist_with_tracks as mock_with_tracks
+        playlist, tracks = mock_with_tracks(playlist_id, artist_id=artist_id)
+        return (playlist, *_count_track_artists(tracks, max_tracks))
+    elif _use_soundcloud():
+        from app.services.soundcloud_client import get_playlist_with_tracks as sc_with_tracks
+        provider, load = "soundcloud", lambda: sc_with_tracks(playlist_id)
+    else:
+        provider, load = "spotify", lambda: _get_playlist_with_tracks(playlist_id)
+
+    def _load() -> Tuple[dict, Dict[str, int], int]:
+        playlist, tracks = load()
+        counts, scanned = _count_track_artists(tracks, max_tracks)
+        # Keep the details without the embedded items page; let get_playlist reuse them
+        playlist = {**playlist, "tracks": {"total": (playlist.get("tracks") or {}).get("total")}}
+        playlist_cache.set(("playlist", provider, playlist_id), playlist)
+        return playlist, counts, scanned
+
+    return playlist_cache.get_or_load(("artist_counts", provider, playlist_id), _load)
+
+
+def get_client_stats() -> dict:
+    """Rate limiter counters and connection reuse for the Spotify client."""
+    return {
+        "rate_limit": get_rate_limit_stats().get("spotify", {}),
+        "http": _http.stats(),
+        "playlist_cache": playlist_cache.stats(),
+        "artist_cache": artist_cache.stats(),
+        "response_cache": response_cache.stats(),
+    }
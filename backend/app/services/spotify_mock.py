@@ -1,36 +1,41 @@
 """Mock Spotify client for development when Spotify app credentials are unavailable."""
 
-from typing import List
+from typing import List, Tuple
 
 _MOCK_PLAYLISTS = [
     {
         "id": "mock_pl_editorial_1",
         "name": "Today's Top Hits",
         "owner": {"id": "spotify", "display_name": "Spotify"},
+        "snapshot_id": "mock_snapshot_1",
         "followers": {"total": 32_000_000},
     },
     {
         "id": "mock_pl_editorial_2",
         "name": "Pop Rising",
         "owner": {"id": "spotify", "display_name": "Spotify"},
+        "snapshot_id": "mock_snapshot_1",
         "followers": {"total": 2_100_000},
     },
     {
         "id": "mock_pl_algo_1",
         "name": "Discover Weekly",
         "owner": {"id": "spotify", "display_name": "Spotify"},
+        "snapshot_id": "mock_snapshot_1",
         "followers": {"total": 0},
     },
     {
         "id": "mock_pl_user_1",
         "name": "Summer Vibes 2024",
         "owner": {"id": "user_abc", "display_name": "MusicFan"},
+        "snapshot_id": "mock_snapshot_1",
         "followers": {"total": 12_400},
     },
     {
         "id": "mock_pl_user_2",
         "name": "Chill Pop Mix",
         "owner": {"id": "user_xyz", "display_name": "CuratorDJ"},
+        "snapshot_id": "mock_snapshot_1",
         "followers": {"total": 8_200},
     },
 ]
@@ -70,11 +75,13 @@ def get_playlist(playlist_id: str) -> dict:
                 "name": p["name"],
                 "owner": p["owner"],
                 "followers": p["followers"],
+                "snapshot_id": p["snapshot_id"],
             }
     return {
         "id": playlist_id,
         "name": "Unknown Playlist",
         "owner": {"id": "unknown", "display_name": "Unknown"},
+        "snapshot_id": "mock_snapshot_1",
         "followers": {"total": 0},
     }
 
@@ -95,3 +102,11 @@ def get_playlist_tracks(
             "artists": [{"id": artist_id, "name": f"Mock Artist ({name})"}],
         })
     return tracks
+
+
+def get_playlist_with_tracks(
+    playlist_id: str,
+    limit: int = 100,
+    artist_id: str | None = None,
+) -> Tuple[dict, List[dict]]:
+    return get_playlist(playlist_id), get_playlist_tracks(playlist_id, limit, artist_id)
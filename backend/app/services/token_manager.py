@@ -0,0 +1,84 @@
+"""
+Thread-safe OAuth token holder for music API clients.
+Refreshes are single-flight: concurrent callers share one token request. Once a token
+enters its refresh window it is renewed in the background while callers keep using it.
+"""
+
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+from app.core.config import settings
+
+# Safety margin subtracted from expires_in so a token is never sent right at expiry
+_EXPIRY_SAFETY_SECONDS = 60
+
+
+class TokenManager:
+    def __init__(self, name: str, fetch: Callable[[], Tuple[str, float]]):
+        """fetch() requests a new token from the provider and returns (access_token, expires_in)."""
+        self.name = name
+        self._fetch = fetch
+        self._token: Optional[str] = None
+        self._expires_at: float = 0
+        # Guards swapping _token/_expires_at; never held across a token request
+        self._lock = threading.Lock()
+        # Serializes token requests (single-flight); only callers without a valid token wait on it
+        self._fetch_lock = threading.Lock()
+        self._spawn_lock = threading.Lock()
+        self._background_refresh: Optional[threading.Thread] = None
+
+    def get_token(self) -> str:
+        token, expires_at = self._token, self._expires_at
+        now = time.time()
+        if token and now < expires_at:
+            if now >= expires_at - settings.PROVIDER_TOKEN_REFRESH_MARGIN_SECONDS:
+                self._refresh_in_background()
+            return token
+
+        with self._fetch_lock:
+            # Another thread may have refreshed while we waited for the lock
+            if self._token and time.time() < self._expires_at:
+                return self._token
+            return self._refresh_locked()
+
+    def invalidate(self, stale_token: str) -> None:
+        """Drop stale_token (e.g. after a 401). A token already replaced by another thread is kept."""
+        with self._lock:
+            if self._token == stale_token:
+                self._token = None
+                self._expires_at = 0
+
+    def _refresh_locked(self) -> str:
+        """Request a new token; the caller holds _fetch_lock."""
+        token, expires_in = self._fetch()
+        with self._lock:
+            self._token = token
+            self._expires_at = time.time() + expires_in - _EXPIRY_SAFETY_SECONDS
+        return token
+
+    def _refresh_in_background(self) -> None:
+        # Never block a caller that still has a valid token
+        if not self._spawn_lock.acquire(blocking=False):
+            return
+        try:
+            if self._background_refresh is not None and self._background_refresh.is_alive():
+                return
+            self._background_refresh = threading.Thread(
+                target=self._background_refresh_run,
+                name=f"{self.name}-token-refresh",
+                daemon=True,
+            )
+            self._background_refresh.start()
+        finally:
+            self._spawn_lock.release()
+
+    def _background_refresh_run(self) -> None:
+        with self._fetch_lock:
+            if time.time() < self._expires_at - settings.PROVIDER_TOKEN_REFRESH_MARGIN_SECONDS:
+                return  # Already refreshed
+            try:
+                self._refresh_locked()
+            except Exception as e:
+                # Current token is still valid; the next caller past expiry retries in the foreground
+                print(f"[{self.name}] Background token refresh failed: {e}")
@@ -0,0 +1,122 @@
+"""
+Shared fixtures: a temporary SQLite database with one user and artist, the mock provider, and a
+TestClient whose requests run against that database as that user.
+"""
+
+import contextlib
+import os
+
+# Keep tests off the configured database and HTTP cache; must be set before app.core.config loads
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ["PROVIDER_HTTP_CACHE_PATH"] = ""
+
+import pytest
+from fastapi import Depends
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.provider import set_provider_override
+from app.core.security import get_current_user
+from app.db.session import Base, create_db_engine, get_db
+from app.main import app
+from app.models import Artist, User
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(bind=engine, autoflush=False)
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def user(db):
+    user = User(email="test@example.com", password_hash="x")
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def make_artist(db, user):
+    def _make(spotify_artist_id: str) -> Artist:
+        artist = Artist(
+            user_id=user.id,
+            spotify_artist_id=spotify_artist_id,
+            name=f"Artist {spotify_artist_id}",
+            spotify_url=f"https://open.spotify.com/artist/{spotify_artist_id}",
+        )
+        db.add(artist)
+        db.commit()
+        return artist
+
+    return _make
+
+
+@pytest.fixture
+def artist(make_artist):
+    return make_artist("artist0")
+
+
+@pytest.fixture
+def provider():
+    """Run against the mock provider; call the fixture to switch provider for the test."""
+    set_provider_override("mock")
+    yield set_provider_override
+    set_provider_override(None)
+
+
+@pytest.fixture
+def client(session_factory, user, provider):
+    """TestClient authenticated as `user`; startup hooks (scheduler, init_db) are not run."""
+    user_id = user.id
+
+    def _get_db():
+        session = session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    def _current_user(db: Session = Depends(get_db)) -> User:
+        return db.get(User, user_id)
+
+    app.dependency_overrides[get_db] = _get_db
+    app.dependency_overrides[get_current_user] = _current_user
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def record_selects(engine):
+    """Context manager collecting (statement, parameters) for every SELECT issued inside it."""
+
+    @contextlib.contextmanager
+    def _record():
+        statements = []
+
+        def _append(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith(("SELECT", "WITH")) and not executemany:
+                statements.append((statement, parameters))
+
+        event.listen(engine, "before_cursor_execute", _append)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", _append)
+
+    return _record
@@ -0,0 +1,37 @@
+"""Keyset cursors: anything not issued by the endpoint is a 400, never a 500 or a silent first page."""
+
+import pytest
+
+from app.api.pagination import NEXT_CURSOR_HEADER, encode_cursor
+
+BAD_CURSORS = [
+    "not base64!",
+    encode_cursor(),
+    encode_cursor("x"),
+    encode_cursor(True),
+    encode_cursor(1, 2),
+    encode_cursor(1, "2024-01-01T00:00:00"),
+    encode_cursor("yesterday", 1),
+]
+
+
+@pytest.fixture
+def refreshed(client, artist):
+    assert client.post(f"/api/artists/{artist.id}/refresh").status_code == 200
+    return artist
+
+
+@pytest.mark.parametrize("path", ["/api/artists/", "/api/artists/{id}/history", "/api/artists/{id}/playlists"])
+@pytest.mark.parametrize("cursor", BAD_CURSORS)
+def test_invalid_cursor_is_rejected(client, refreshed, path, cursor):
+    response = client.get(path.format(id=refreshed.id), params={"limit": 1, "cursor": cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+@pytest.mark.parametrize("path", ["/api/artists/{id}/history", "/api/artists/{id}/playlists"])
+def test_issued_cursor_is_accepted(client, refreshed, path):
+    client.post(f"/api/artists/{refreshed.id}/refresh")
+    first = client.get(path.format(id=refreshed.id), params={"limit": 1})
+    response = client.get(path.format(id=refreshed.id), params={"limit": 1, "cursor": first.headers[NEXT_CURSOR_HEADER]})
+    assert response.status_code == 200
@@ -0,0 +1,43 @@
+"""
+SELECT counts for a refresh against an existing snapshot and for GET /artists/{id}/playlists must
+not grow with the number of playlists.
+"""
+
+from typing import Dict, List
+
+from app.services import spotify_mock
+
+
+def _mock_playlists(count: int) -> List[dict]:
+    return [
+        {
+            "id": f"mock_pl_user_{i}",
+            "name": f"Playlist {i}",
+            "owner": {"id": f"user_{i}", "display_name": f"Curator {i}"},
+            "snapshot_id": "mock_snapshot_1",
+            "followers": {"total": i},
+        }
+        for i in range(count)
+    ]
+
+
+def _count_selects(client, record_selects, monkeypatch, artist, playlists: int) -> Dict[str, int]:
+    monkeypatch.setattr(spotify_mock, "_MOCK_PLAYLISTS", _mock_playlists(playlists))
+    # Every search returns all playlists so discovery finds the full set despite per-query limits
+    monkeypatch.setattr(spotify_mock, "search_playlists", lambda query, limit=50: list(spotify_mock._MOCK_PLAYLISTS))
+
+    assert client.post(f"/api/artists/{artist.id}/refresh").status_code == 200
+    with record_selects() as refresh:
+        response = client.post(f"/api/artists/{artist.id}/refresh")
+    assert response.status_code == 200
+    assert len(response.json()["current_playlists"]) == playlists
+
+    with record_selects() as listing:
+        assert client.get(f"/api/artists/{artist.id}/playlists").status_code == 200
+    return {"refresh": len(refresh), "playlists": len(listing)}
+
+
+def test_select_count_does_not_grow_with_playlists(client, record_selects, monkeypatch, make_artist):
+    small = _count_selects(client, record_selects, monkeypatch, make_artist("small"), 5)
+    large = _count_selects(client, record_selects, monkeypatch, make_artist("large"), 50)
+    assert small == large
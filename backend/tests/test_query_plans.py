@@ -0,0 +1,65 @@
+"""
+Query plans for the hot read paths: a refresh and the dashboard, history and playlists routes
+(first and second pages) must not fall back to a full scan of snapshots or placements.
+"""
+
+import re
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import update
+
+from app.api.pagination import NEXT_CURSOR_HEADER
+from app.models import Snapshot
+
+# "SCAN placements", "SCAN snapshots_1 USING INDEX ..." (a full index walk is still a full scan)
+_FULL_SCAN = re.compile(r"^SCAN (snapshots|placements)(_\d+)?\b")
+
+ARTISTS = 3
+REFRESHES_PER_ARTIST = 3
+
+
+def _run_hot_paths(client, artist_id: int) -> None:
+    assert client.post(f"/api/artists/{artist_id}/refresh").status_code == 200
+    for path in ("/api/artists/", f"/api/artists/{artist_id}/history", f"/api/artists/{artist_id}/playlists"):
+        assert client.get(path).status_code == 200
+
+    # Second pages through the keyset cursors
+    since = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
+    for path, params in (
+        ("/api/artists/", {"limit": 1}),
+        (f"/api/artists/{artist_id}/history", {"limit": 2, "since": since}),
+        (f"/api/artists/{artist_id}/playlists", {"limit": 2}),
+    ):
+        first = client.get(path, params=params)
+        assert first.status_code == 200
+        cursor = first.headers[NEXT_CURSOR_HEADER]
+        assert client.get(path, params={"limit": params["limit"], "cursor": cursor}).status_code == 200
+
+
+def test_hot_paths_avoid_full_scans(client, db, engine, record_selects, make_artist):
+    artists = [make_artist(f"explain{i}") for i in range(ARTISTS)]
+    for artist in artists:
+        for _ in range(REFRESHES_PER_ARTIST):
+            assert client.post(f"/api/artists/{artist.id}/refresh").status_code == 200
+
+    artist_id = artists[0].id
+    # History falls back to streaming placements for snapshots without a stored summary
+    db.execute(update(Snapshot).where(Snapshot.artist_id == artist_id).values(gained_count=None, lost_count=None))
+    db.commit()
+
+    with record_selects() as statements:
+        _run_hot_paths(client, artist_id)
+
+    plans = {}
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            if statement not in plans:
+                plans[statement] = [
+                    row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+                ]
+    full_scans = {
+        " ".join(statement.split()): plan
+        for statement, plan in plans.items()
+        if any(_FULL_SCAN.match(step) for step in plan)
+    }
+    assert not full_scans
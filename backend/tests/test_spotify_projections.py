@@ -0,0 +1,171 @@
+"""
+The Spotify fields= projections must cover everything discovery reads.
+
+Discovery runs against canned Spotify responses cut down to the projections declared in
+spotify_client (PLAYLIST_FIELDS, PLAYLIST_TRACKS_FIELDS, SEARCH_PLAYLIST_FIELDS); reading any key
+outside them is recorded as a violation.
+"""
+
+from typing import Any, List
+
+import pytest
+
+from app.services import discovery, spotify_client
+from app.services.spotify_client import (
+    BASE_URL,
+    PLAYLIST_FIELDS,
+    PLAYLIST_TRACKS_FIELDS,
+    SEARCH_PLAYLIST_FIELDS,
+)
+
+ARTIST_ID = "check_artist"
+# Playlist long enough to need a second items page
+TRACKS = 150
+
+
+class NotProjected(KeyError):
+    pass
+
+
+class _Projected(dict):
+    """Response limited to a projection; reading a key outside it records and raises NotProjected."""
+
+    def __init__(self, data: dict, projection: dict, path: str, violations: List[str]):
+        super().__init__(
+            (key, _project(data[key], sub, f"{path}.{key}", violations))
+            for key, sub in projection.items()
+            if key in data
+        )
+        self._projection = projection
+        self._path = path
+        # Verification swallows per-playlist errors, so every violation is also recorded here
+        self._violations = violations
+
+    def _check(self, key: Any) -> None:
+        if key not in self._projection:
+            self._violations.append(f"{self._path}.{key}")
+            raise NotProjected(self._violations[-1])
+
+    def __getitem__(self, key):
+        self._check(key)
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        self._check(key)
+        return super().get(key, default)
+
+    def __contains__(self, key) -> bool:
+        self._check(key)
+        return super().__contains__(key)
+
+
+def _project(value: Any, projection: dict | None, path: str, violations: List[str]) -> Any:
+    if projection is None:
+        return value
+    if isinstance(value, list):
+        return [_project(item, projection, f"{path}[]", violations) for item in value]
+    if isinstance(value, dict):
+        return _Projected(value, projection, path, violations)
+    return value
+
+
+def _track(index: int) -> dict:
+    # Full track objects carry much more than discovery needs; some artists only have a uri
+    artist_id = ARTIST_ID if index % 3 == 0 else "other"
+    artist = {"name": "Artist", "uri": f"spotify:artist:{artist_id}"}
+    if index % 2:
+        artist["id"] = artist_id
+    return {
+        "id": f"track{index}",
+        "name": f"Track {index}",
+        "uri": f"spotify:track:track{index}",
+        "available_markets": ["US", "GB", "DE"],
+        "album": {"id": "album", "images": [{"url": "https://example.com/a.jpg"}]},
+        "artists": [artist],
+    }
+
+
+def _playlist(playlist_id: str, snapshot_id: str) -> dict:
+    return {
+        "id": playlist_id,
+        "name": f"Playlist {playlist_id}",
+        "description": "A playlist",
+        "images": [{"url": "https://example.com/p.jpg"}],
+        "snapshot_id": snapshot_id,
+        "owner": {"id": "owner", "display_name": "Owner", "href": "https://example.com/owner"},
+        "followers": {"total": 10, "href": None},
+        "public": True,
+    }
+
+
+def _items_page(offset: int, playlist_id: str) -> dict:
+    end = min(offset + 100, TRACKS)
+    return {
+        "items": [{"added_at": "2024-01-01T00:00:00Z", "track": _track(i)} for i in range(offset, end)],
+        "total": TRACKS,
+        "next": f"{BASE_URL}/playlists/{playlist_id}/tracks?offset={end}&limit=100" if end < TRACKS else None,
+    }
+
+
+@pytest.fixture
+def violations(monkeypatch, provider) -> List[str]:
+    """Serve canned Spotify responses through the declared projections; yields the keys read outside them."""
+    violations: List[str] = []
+
+    def _fake_request(endpoint: str, params: dict | None = None) -> Any:
+        params = params or {}
+        if endpoint == f"/artists/{ARTIST_ID}":
+            return {"id": ARTIST_ID, "name": "Check Artist", "images": []}
+        if endpoint == f"/artists/{ARTIST_ID}/top-tracks":
+            return {"tracks": [_track(0), _track(3)]}
+        if endpoint == "/search":
+            items = [_playlist("unchanged", "v1"), _playlist("changed", "v2"), _playlist("new", "v1")]
+            return {"playlists": {"items": _project(items, SEARCH_PLAYLIST_FIELDS, "search.items", violations)}}
+        if endpoint.endswith("/tracks"):
+            playlist_id = endpoint.split("/")[2]
+            assert params.get("fields") == spotify_client._TRACK_FIELDS, params
+            page = _items_page(int(params.get("offset", 0)), playlist_id)
+            return _project(page, PLAYLIST_TRACKS_FIELDS, "playlist_items", violations)
+        if endpoint.startswith("/playlists/"):
+            playlist_id = endpoint.split("/")[2]
+            assert params.get("fields") == spotify_client._PLAYLIST_FIELDS, params
+            playlist = {**_playlist(playlist_id, "v2"), "tracks": _items_page(0, playlist_id)}
+            return _project(playlist, PLAYLIST_FIELDS, "playlist", violations)
+        raise AssertionError(f"Unexpected request {endpoint}")
+
+    original_counts = discovery.get_playlist_artist_counts
+
+    def _projected_counts(*args, **kwargs):
+        # The client caches a copy of the playlist details; hand discovery the projected view again
+        playlist, counts, scanned = original_counts(*args, **kwargs)
+        return _project(playlist, PLAYLIST_FIELDS, "playlist", violations), counts, scanned
+
+    provider("spotify")
+    monkeypatch.setattr(spotify_client, "_make_request", _fake_request)
+    monkeypatch.setattr(discovery, "get_playlist_artist_counts", _projected_counts)
+    spotify_client.playlist_cache.clear()
+    spotify_client.artist_cache.clear()
+    yield violations
+    spotify_client.playlist_cache.clear()
+    spotify_client.artist_cache.clear()
+
+
+def test_discovery_reads_only_projected_fields(violations):
+    try:
+        found = discovery.discover_playlists(
+            ARTIST_ID,
+            db=None,
+            previous={
+                # Same marker as the search result: carried forward from search fields only
+                "unchanged": {"tracks_count": 1, "total_tracks": 1, "source_marker": "v1"},
+                "changed": {"tracks_count": 1, "total_tracks": 1, "source_marker": "v1"},
+            },
+        )
+    except NotProjected:
+        found = []
+    assert sorted(set(violations)) == []
+
+    # A dropped key that discovery skips over instead of reading shows up as a wrong count
+    expected = len(range(0, TRACKS, 3))
+    counts = {pl["spotify_playlist_id"]: pl["tracks_count"] for pl in found}
+    assert counts == {"unchanged": 1, "changed": expected, "new": expected}
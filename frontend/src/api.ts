@@ -47,9 +47,33 @@ export interface ArtistQueryResponse {
   current_playlists: PlaylistSummary[]
 }
 
+export type JobState = 'queued' | 'running' | 'succeeded' | 'failed'
+
+export interface Job {
+  id: string
+  kind: string
+  state: JobState
+  /** 0..1 */
+  progress: number
+  artist_id: number | null
+  created_at: string
+  started_at: string | null
+  finished_at: string | null
+  error: string | null
+  result: ArtistQueryResponse | null
+}
+
+/** One page of a keyset-paginated list; pass nextCursor back to get the following page. */
+export interface Page<T> {
+  items: T[]
+  nextCursor: string | null
+}
+
+export const PAGE_SIZE = 50
+
 // --- Generic fetch helper ---
 
-async function api<T>(path: string, options: RequestInit = {}): Promise<T> {
+async function request(path: string, options: RequestInit = {}): Promise<Response> {
   const url = `${getBaseUrl()}/api${path}`
   const headers: HeadersInit = {
     'Content-Type': 'application/json',
@@ -66,15 +90,53 @@ async function api<T>(path: string, options: RequestInit = {}): Promise<T> {
     const err = (await res.json().catch(() => ({}))).detail || res.statusText
     throw new Error(err)
   }
+  return res
+}
+
+async function api<T>(path: string, options: RequestInit = {}): Promise<T> {
+  const res = await request(path, options)
   return res.json() as Promise<T>
 }
 
+/** GET a paginated list endpoint; the next cursor comes back in the X-Next-Cursor header. */
+async function apiPage<T>(path: string, params: URLSearchParams, cursor: string | null, limit: number): Promise<Page<T>> {
+  params.set('limit', String(limit))
+  if (cursor) params.set('cursor', cursor)
+  const res = await request(`${path}?${params.toString()}`)
+  return { items: (await res.json()) as T[], nextCursor: res.headers.get('X-Next-Cursor') }
+}
+
+/**
+ * Fetch every page in order, calling onPage with the items loaded so far after each one.
+ * Stops early (without calling onPage again) once isCancelled() returns true.
+ */
+export async function loadAllPages<T>(
+  fetchPage: (cursor: string | null) => Promise<Page<T>>,
+  onPage: (itemsSoFar: T[]) => void,
+  isCancelled: () => boolean = () => false,
+): Promise<T[]> {
+  let items: T[] = []
+  let cursor: string | null = null
+  do {
+    const page: Page<T> = await fetchPage(cursor)
+    if (isCancelled()) break
+    items = items.concat(page.items)
+    onPage(items)
+    cursor = page.nextCursor
+  } while (cursor)
+  return items
+}
+
 // --- API functions ---
 
 export function getArtists(): Promise<Artist[]> {
   return api<Artist[]>('/artists')
 }
 
+export function getArtistsPage(cursor: string | null = null, limit = PAGE_SIZE): Promise<Page<Artist>> {
+  return apiPage<Artist>('/artists/', new URLSearchParams(), cursor, limit)
+}
+
 export function createFromUrl(url: string): Promise<ArtistQueryResponse> {
   return api<ArtistQueryResponse>('/artists/from-url', {
     method: 'POST',
@@ -90,12 +152,58 @@ export function getArtistPlaylists(id: number): Promise<PlaylistSummary[]> {
   return api<PlaylistSummary[]>(`/artists/${id}/playlists`)
 }
 
-export function getArtistHistory(id: number): Promise<SnapshotWithChanges[]> {
-  return api<SnapshotWithChanges[]>(`/artists/${id}/history`)
+export function getArtistPlaylistsPage(
+  id: number,
+  cursor: string | null = null,
+  limit = PAGE_SIZE,
+): Promise<Page<PlaylistSummary>> {
+  return apiPage<PlaylistSummary>(`/artists/${id}/playlists`, new URLSearchParams(), cursor, limit)
+}
+
+export interface HistoryWindow {
+  /** ISO timestamps bounding snapshot_time (inclusive) */
+  since?: string
+  until?: string
+  /** Most recent N snapshots within the window */
+  limit?: number
+}
+
+export function getArtistHistory(id: number, window: HistoryWindow = {}): Promise<SnapshotWithChanges[]> {
+  const params = new URLSearchParams()
+  if (window.since) params.set('since', window.since)
+  if (window.until) params.set('until', window.until)
+  if (window.limit) params.set('limit', String(window.limit))
+  const query = params.toString()
+  return api<SnapshotWithChanges[]>(`/artists/${id}/history${query ? `?${query}` : ''}`)
+}
+
+/** Newest-first page of history within the window (window.limit is ignored; use limit). */
+export function getArtistHistoryPage(
+  id: number,
+  cursor: string | null = null,
+  limit = PAGE_SIZE,
+  window: HistoryWindow = {},
+): Promise<Page<SnapshotWithChanges>> {
+  const params = new URLSearchParams()
+  if (window.since) params.set('since', window.since)
+  if (window.until) params.set('until', window.until)
+  return apiPage<SnapshotWithChanges>(`/artists/${id}/history`, params, cursor, limit)
+}
+
+/** 'verify_only' re-checks the latest snapshot's playlists without searching for new ones. */
+export type RefreshMode = 'full' | 'verify_only'
+
+export function refreshArtist(id: number, mode: RefreshMode = 'full'): Promise<ArtistQueryResponse> {
+  return api<ArtistQueryResponse>(`/artists/${id}/refresh?mode=${mode}`, { method: 'POST' })
+}
+
+/** Queue a refresh in the background; poll with getJob until state is succeeded/failed. */
+export function refreshArtistAsync(id: number, mode: RefreshMode = 'full'): Promise<Job> {
+  return api<Job>(`/artists/${id}/refresh?run_async=true&mode=${mode}`, { method: 'POST' })
 }
 
-export function refreshArtist(id: number): Promise<ArtistQueryResponse> {
-  return api<ArtistQueryResponse>(`/artists/${id}/refresh`, { method: 'POST' })
+export function getJob(jobId: string): Promise<Job> {
+  return api<Job>(`/jobs/${jobId}`)
 }
 
 // --- Config (music provider) ---
@@ -1,9 +1,10 @@
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import { Link, useParams } from 'react-router-dom'
 import {
   getArtist,
-  getArtistPlaylists,
-  getArtistHistory,
+  getArtistPlaylistsPage,
+  getArtistHistoryPage,
+  loadAllPages,
   refreshArtist,
   type Artist,
   type PlaylistSummary,
@@ -25,6 +26,8 @@ export default function ArtistDetailPage() {
   const [error, setError] = useState<string | null>(null)
   const [refreshing, setRefreshing] = useState(false)
   const [activeTab, setActiveTab] = useState<Tab>('playlists')
+  // Bumped on every load so pages from a superseded load are dropped
+  const loadGeneration = useRef(0)
 
   function load() {
     const numId = id ? parseInt(id, 10) : NaN
@@ -34,26 +37,31 @@ export default function ArtistDetailPage() {
       return
     }
 
+    const generation = ++loadGeneration.current
+    const isCancelled = () => generation !== loadGeneration.current
     setLoading(true)
     setError(null)
 
+    // The page renders once the artist is in; list pages replace/append as they arrive
     Promise.all([
-      getArtist(numId),
-      getArtistPlaylists(numId),
-      getArtistHistory(numId),
-    ])
-      .then(([a, pl, h]) => {
+      getArtist(numId).then((a) => {
+        if (isCancelled()) return
         setArtist(a)
-        setPlaylists(pl)
-        setHistory(h)
-      })
+        setLoading(false)
+      }),
+      loadAllPages((cursor) => getArtistPlaylistsPage(numId, cursor), setPlaylists, isCancelled),
+      loadAllPages((cursor) => getArtistHistoryPage(numId, cursor), setHistory, isCancelled),
+    ])
       .catch((e) => {
+        if (isCancelled()) return
         setError(e instanceof Error ? e.message : 'Failed to load')
         setArtist(null)
         setPlaylists([])
         setHistory([])
       })
-      .finally(() => setLoading(false))
+      .finally(() => {
+        if (!isCancelled()) setLoading(false)
+      })
   }
 
   useEffect(() => {
@@ -1,5 +1,5 @@
-import { useState, useEffect } from 'react'
-import { getArtists, createFromUrl, refreshArtist, type Artist } from '../api'
+import { useState, useEffect, useRef } from 'react'
+import { getArtistsPage, loadAllPages, createFromUrl, refreshArtist, type Artist } from '../api'
 import ArtistCard from '../components/ArtistCard'
 import { FaPlus, FaUsers, FaSpinner, FaMusic } from 'react-icons/fa'
 
@@ -11,14 +11,29 @@ export default function ArtistsPage() {
   const [successMessage, setSuccessMessage] = useState<string | null>(null)
   const [adding, setAdding] = useState(false)
   const [refreshingId, setRefreshingId] = useState<number | null>(null)
+  // Bumped on every load so pages from a superseded load are dropped
+  const loadGeneration = useRef(0)
 
   function load() {
+    const generation = ++loadGeneration.current
+    const isCancelled = () => generation !== loadGeneration.current
     setLoading(true)
     setError(null)
-    getArtists()
-      .then(setArtists)
-      .catch((e) => setError(e instanceof Error ? e.message : 'Failed to load'))
-      .finally(() => setLoading(false))
+    // Show the first page as soon as it arrives; later pages are appended as they load
+    loadAllPages(
+      (cursor) => getArtistsPage(cursor),
+      (items) => {
+        setArtists(items)
+        setLoading(false)
+      },
+      isCancelled,
+    )
+      .catch((e) => {
+        if (!isCancelled()) setError(e instanceof Error ? e.message : 'Failed to load')
+      })
+      .finally(() => {
+        if (!isCancelled()) setLoading(false)
+      })
   }
 
   useEffect(() => {